@@ -1,3 +1,14 @@
+import asyncio
+import logging
+
+# Install uvloop before any event loop is created (Linux/macOS only);
+# fall back to the default asyncio policy if unavailable.
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    uvloop = None
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -9,6 +20,9 @@ from app.chat.routes_deepseek import router as deepseek_router
 
 load_dotenv()
 
+if uvloop is not None and isinstance(asyncio.get_event_loop_policy(), uvloop.EventLoopPolicy):
+    logging.getLogger(__name__).info("uvloop event loop policy installed")
+
 # ChatConnect Configuration
 app_name = os.getenv("CHATCONNECT_APP_NAME", "ChatConnect")
 app_version = os.getenv("CHATCONNECT_VERSION", "1.0.0")
@@ -53,6 +67,23 @@ async def root():
         }
     }
 
+@app.on_event("startup")
+async def start_background_tasks():
+    """Start the OAuth state reaper for the app's lifetime"""
+    from app.services.oauth_service import oauth_service
+    oauth_service.start_cleanup_task()
+
+@app.on_event("shutdown")
+async def shutdown_http_sessions():
+    """Close every shared HTTP session and connection pool on shutdown"""
+    from app.services.oauth_service import close_session, oauth_service
+    from app.services.mcp_service import mcp_service
+    from app.services.mcp_service_deepseek import mcp_service_deepseek
+    await oauth_service.stop_cleanup_task()
+    await close_session()
+    await mcp_service.close()
+    await mcp_service_deepseek.aclose()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -3,6 +3,7 @@ import json
 import subprocess
 import aiohttp
 import websockets
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 from urllib.parse import urlparse
 import logging
@@ -14,7 +15,7 @@ logger = logging.getLogger(__name__)
 # since we don't have MCP servers set up yet. This will be ready for when you add them.
 
 class MCPClient:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], session: Optional[aiohttp.ClientSession] = None):
         self.config = config
         self.server_type = config.get("type", "custom")
         self.uri = config.get("uri", "")
@@ -24,7 +25,22 @@ class MCPClient:
         self.is_connected = False
         self.server_name = config.get("name", "Unknown Server")
         self.last_error = None
-    
+        self._session = session
+
+    @asynccontextmanager
+    async def _http_session(self):
+        """Yield the injected shared HTTP session, or a temporary one
+
+        Clients created by MCPService share one session so every server
+        benefits from the same connection pool and DNS cache; a client
+        constructed standalone still gets a session of its own.
+        """
+        if self._session is not None and not self._session.closed:
+            yield self._session
+        else:
+            async with aiohttp.ClientSession() as session:
+                yield session
+
     async def connect(self) -> bool:
         """Connect to the MCP server based on transport type"""
         try:
@@ -99,7 +115,7 @@ class MCPClient:
     async def _connect_sse(self) -> bool:
         """Connect to SSE-based MCP server"""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._http_session() as session:
                 # Test connection to SSE endpoint
                 async with session.get(self.uri) as response:
                     if response.status == 200:
@@ -152,7 +168,7 @@ class MCPClient:
             # For now, assume it's a simple HTTP endpoint
             parsed = urlparse(self.uri)
             if parsed.scheme in ['http', 'https']:
-                async with aiohttp.ClientSession() as session:
+                async with self._http_session() as session:
                     # First try the /health endpoint
                     try:
                         async with session.get(self.uri + '/health') as response:
@@ -257,7 +273,7 @@ class MCPClient:
             elif self.server_type in ["custom", "sse"] and self.uri:
                 # Handle HTTP-based MCP servers (like Pipedream)
                 try:
-                    async with aiohttp.ClientSession() as session:
+                    async with self._http_session() as session:
                         # Try POST request to the MCP server with proper headers
                         headers = {
                             "Content-Type": "application/json",
@@ -568,7 +584,7 @@ class MCPClient:
             elif self.server_type in ["custom", "sse"] and self.uri:
                 # Handle HTTP-based MCP servers (like Pipedream)
                 try:
-                    async with aiohttp.ClientSession() as session:
+                    async with self._http_session() as session:
                         # Try POST request to the MCP server
                         async with session.post(
                             self.uri,
@@ -749,11 +765,24 @@ class MCPClient:
 class MCPService:
     def __init__(self):
         self.clients: Dict[str, MCPClient] = {}
-    
+        self._http: Optional[aiohttp.ClientSession] = None
+
+    def _http_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use
+
+        All clients share one session so probes against N servers reuse
+        TCP connections and the DNS cache instead of handshaking N times.
+        """
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+            )
+        return self._http
+
     async def connect_to_server(self, server_id: str, config: Dict[str, Any]) -> bool:
         """Connect to an MCP server and store the client"""
         try:
-            client = MCPClient(config)
+            client = MCPClient(config, session=self._http_session())
             success = await client.connect()
             
             if success:
@@ -774,6 +803,14 @@ class MCPService:
             await self.clients[server_id].disconnect()
             del self.clients[server_id]
             logger.info(f"Disconnected from MCP server {server_id}")
+
+    async def close(self) -> None:
+        """Disconnect every server and close the shared HTTP session"""
+        for server_id in list(self.clients):
+            await self.disconnect_from_server(server_id)
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+            self._http = None
     
     def get_all_tools(self) -> List[Dict[str, Any]]:
         """Get all available tools from all connected servers"""
@@ -1,11 +1,17 @@
 import asyncio
+import contextlib
+import itertools
 import json
+import re
 import aiohttp
 import websockets
 import httpx
+import socket
+import sys
 import time
 import smtplib
 import os
+from collections import OrderedDict
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import List, Dict, Any, Optional
@@ -13,30 +19,177 @@ from urllib.parse import urlparse
 import logging
 from datetime import datetime
 
+try:
+    import ijson  # incremental JSON parsing for large tool responses
+except ImportError:
+    ijson = None
+
+try:
+    import aiosmtplib  # non-blocking SMTP with a persistent connection
+except ImportError:
+    aiosmtplib = None
+
+# Faster JSON codec for wire payloads when available; the helpers keep the
+# stdlib signatures so call sites don't care which one is in use
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj)
+
+    _loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Name heuristic for Pipedream-capable tools; one C-level scan instead of
+# a lowercase allocation plus several substring checks per execution
+_PIPEDREAM_NAME_RE = re.compile(r"^mcp_|gmail|drive", re.IGNORECASE)
+
+# The health probe body never changes; serialize it once at import
+_HEALTH_BODY = json.dumps({
+    "jsonrpc": "2.0",
+    "id": "health_check",
+    "method": "tools/list",
+    "params": {}
+}).encode()
+_HEALTH_HEADERS = {"Content-Type": "application/json"}
+
+# Static advice attached to failed Pipedream calls; built once so repeated
+# failures during an outage don't re-allocate it
+_WORKFLOW_OPT_TIPS = """
+🔧 Pipedream Workflow Optimization Suggestions:
+
+1. **Check for Infinite Loops**: Ensure your workflow doesn't have loops that never terminate
+2. **Reduce API Calls**: Minimize the number of external API calls in your workflow
+3. **Add Timeouts**: Set appropriate timeouts for each step in your workflow
+4. **Simplify Logic**: Remove unnecessary complex logic or data processing
+5. **Check Gmail Authentication**: Ensure Gmail OAuth is properly configured
+6. **Use Async Steps**: Use asynchronous steps where possible to improve performance
+
+🔍 Debug Steps:
+1. Go to your Pipedream dashboard
+2. Find workflow ID: 6919d1b2-8143-422f-a5ae-6bca936cdbe6
+3. Check the execution logs for stuck steps
+4. Look for steps taking longer than 30 seconds
+5. Optimize or remove slow steps
+
+💡 Quick Fix: Create a simpler test workflow with just basic email sending to verify the integration works.
+        """
+
+# Disable Nagle (sub-MSS JSON-RPC payloads otherwise hit the Nagle +
+# delayed-ACK 40 ms stall on some kernels) and widen the socket buffers so
+# large tool responses need fewer syscalls to drain.
+_SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20),
+    (socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20),
+    # Long SSE reads can sit idle for minutes; TCP keepalives stop NAT
+    # boxes and firewalls from silently dropping the connection mid-stream
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+if hasattr(socket, "TCP_KEEPIDLE"):
+    _SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60))
+if hasattr(socket, "TCP_KEEPINTVL"):
+    _SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 30))
+
+class _TunedTCPConnector(aiohttp.TCPConnector):
+    """TCPConnector that applies _SOCKET_OPTIONS to every new connection"""
+
+    async def _wrap_create_connection(self, *args, **kwargs):
+        transport, protocol = await super()._wrap_create_connection(*args, **kwargs)
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            for level, option, value in _SOCKET_OPTIONS:
+                try:
+                    sock.setsockopt(level, option, value)
+                except OSError:
+                    # Not every platform accepts every option; best effort
+                    pass
+        return transport, protocol
+
+async def _iter_sse_data(chunks):
+    """Yield the payload of each SSE ``data:`` line as it arrives
+
+    Incremental parser over an async iterator of byte chunks (aiohttp's
+    ``content.iter_any()`` or httpx's ``aiter_bytes()``): chunks accumulate
+    in a single bytearray and a cursor tracks how far line-scanning has
+    progressed, so already-inspected bytes are never re-scanned and the
+    first event is dispatched without waiting for the rest of the body.
+    Payloads are yielded as bytes — the JSON decoder takes them directly,
+    so framing lines never pay for UTF-8 decoding at all.
+    """
+    buf = bytearray()
+    start = 0
+    async for chunk in chunks:
+        buf += chunk
+        while True:
+            nl = buf.find(b'\n', start)
+            if nl == -1:
+                break
+            line = bytes(buf[start:nl]).rstrip(b'\r')
+            start = nl + 1
+            if line.startswith(b'data: '):
+                yield line[6:]
+        if start:
+            del buf[:start]
+            start = 0
+
+def _make_connector() -> aiohttp.TCPConnector:
+    """Build the tuned connector used for all MCP HTTP traffic"""
+    return _TunedTCPConnector(
+        limit=64,
+        use_dns_cache=True,
+        ttl_dns_cache=300,
+        keepalive_timeout=75,
+    )
+
+# Shared HTTP/2 client for Pipedream traffic. Pipedream serves SSE over
+# TLS, so multiplexing every workflow call onto one connection avoids
+# repeat TCP/TLS handshakes and shrinks header bytes via HPACK.
+_pd_client: Optional[httpx.AsyncClient] = None
+
+def _get_pd_client() -> httpx.AsyncClient:
+    """Lazily build the process-wide Pipedream client"""
+    global _pd_client
+    if _pd_client is None or _pd_client.is_closed:
+        limits = httpx.Limits(max_keepalive_connections=20)
+        timeout = httpx.Timeout(connect=5.0, read=30.0, write=30.0, pool=5.0)
+        try:
+            _pd_client = httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+        except ImportError:
+            # h2 not installed; HTTP/1.1 still reuses the keepalive pool
+            _pd_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+    return _pd_client
+
+async def _close_pd_client() -> None:
+    """Close the shared Pipedream client (call on service shutdown)"""
+    global _pd_client
+    if _pd_client is not None and not _pd_client.is_closed:
+        await _pd_client.aclose()
+    _pd_client = None
+
 class MCPLogger:
     """Enhanced logging for MCP operations"""
-    
-    def __init__(self):
-        self.log_file = f"mcp_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-    
+
     def log_function_call(self, step: int, message: str, data: Dict[str, Any] = None):
         """Log function call steps"""
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "step": step,
-            "message": message,
-            "data": data
-        }
-        logger.info(f"MCP Function Call Step {step}: {message}")
-        if data:
-            logger.debug(f"Step {step} Data: {json.dumps(data, indent=2)}")
-    
+        logger.info("MCP Function Call Step %d: %s", step, message)
+        # Serializing the payload is only worth it if DEBUG records are kept
+        if data and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Step %d Data: %s", step,
+                         json.dumps(data, separators=(',', ':'), default=str))
+
     def log_execution_result(self, success: bool, result: Dict[str, Any]):
         """Log execution results"""
         status = "SUCCESS" if success else "FAILURE"
-        logger.info(f"MCP Execution {status}: {json.dumps(result, indent=2)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("MCP Execution %s: %s", status,
+                        json.dumps(result, separators=(',', ':'), default=str))
     
     def log_connection_attempt(self, server_name: str, uri: str, success: bool):
         """Log connection attempts"""
@@ -52,113 +205,209 @@ class ValidationResult:
 class PipedreamHealthChecker:
     """Check Pipedream workflow health before executing"""
     
+    # Bound the cache so a long-running process with many workflows cannot
+    # grow it without limit
+    _CACHE_MAXSIZE = 256
+
     def __init__(self):
-        self.health_cache = {}
         self.cache_ttl = 300  # 5 minutes
-    
+        # LRU of workflow_url -> (timestamp, result)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        # One probe per URL at a time; concurrent callers await the same future
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Per-URL EMA of response time and success rate, used to adapt TTLs
+        self._stats: Dict[str, Dict[str, float]] = {}
+        # Long-lived client so repeat probes reuse the TCP/TLS connection
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Lazily build the shared httpx client"""
+        if self._client is None or self._client.is_closed:
+            # httpx requires either a default or all four params; set all explicitly
+            timeout = httpx.Timeout(connect=10.0, read=30.0, write=30.0, pool=30.0)
+            self._client = httpx.AsyncClient(timeout=timeout)
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared client (call on service shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def cached_health(self, workflow_url: str) -> Optional[Dict]:
+        """Return the fresh cached health result, or None if stale/absent"""
+        entry = self._cache.get(workflow_url)
+        if entry is not None and time.monotonic() - entry[0] < entry[1]:
+            self._cache.move_to_end(workflow_url)
+            return entry[2]
+        return None
+
     async def check_workflow_health(self, workflow_url: str) -> Dict:
         """Check if Pipedream workflow is healthy"""
-        
-        # Check cache first
-        cache_key = f"health_{workflow_url}"
-        if cache_key in self.health_cache:
-            cached_result = self.health_cache[cache_key]
-            if time.time() - cached_result["timestamp"] < self.cache_ttl:
-                return cached_result["result"]
-        
+
+        # Fresh cache entry: serve it and keep it hot in the LRU
+        cached = self.cached_health(workflow_url)
+        if cached is not None:
+            return cached
+
+        # A probe for this URL is already running; share its result instead
+        # of dogpiling the workflow with duplicate checks
+        inflight = self._inflight.get(workflow_url)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_event_loop().create_future()
+        self._inflight[workflow_url] = future
         try:
-            # Send a simple health check request
-            health_request = {
-                "jsonrpc": "2.0",
-                "id": "health_check",
-                "method": "tools/list",
-                "params": {}
-            }
-            
-            # httpx requires either a default or all four params; set all explicitly
-            timeout = httpx.Timeout(connect=10.0, read=30.0, write=30.0, pool=30.0)
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    workflow_url,
-                    json=health_request,
-                    headers={"Content-Type": "application/json"}
-                )
-                
-                if response.status_code == 200:
-                    result = {
-                        "healthy": True,
-                        "response_time": response.elapsed.total_seconds(),
-                        "message": "Workflow is responding normally"
-                    }
-                else:
-                    result = {
-                        "healthy": False,
-                        "error": f"HTTP {response.status_code}",
-                        "message": "Workflow returned error status"
-                    }
-                
-                # Cache the result
-                self.health_cache[cache_key] = {
-                    "result": result,
-                    "timestamp": time.time()
+            result = await self._probe_workflow(workflow_url)
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(workflow_url, None)
+            if not future.done():
+                future.cancel()
+
+    async def _probe_workflow(self, workflow_url: str) -> Dict:
+        """Run a single health probe and cache its outcome"""
+        try:
+            # Send the pre-serialized health check request
+            client = self._get_client()
+            response = await client.post(
+                workflow_url,
+                content=_HEALTH_BODY,
+                headers=_HEALTH_HEADERS
+            )
+
+            response_time = response.elapsed.total_seconds()
+            if response.status_code == 200:
+                result = {
+                    "healthy": True,
+                    "response_time": response_time,
+                    "message": "Workflow is responding normally"
                 }
-                
-                return result
-                
+            else:
+                result = {
+                    "healthy": False,
+                    "error": f"HTTP {response.status_code}",
+                    "message": "Workflow returned error status"
+                }
+
+            self._update_stats(workflow_url, result["healthy"], response_time)
+            self._store(workflow_url, result)
+            return result
+
         except httpx.TimeoutException:
+            self._update_stats(workflow_url, False, 30.0)
             return {
                 "healthy": False,
                 "error": "Health check timeout",
                 "message": "Workflow is not responding to health checks"
             }
         except Exception as e:
+            self._update_stats(workflow_url, False, 30.0)
             return {
                 "healthy": False,
                 "error": str(e),
                 "message": "Health check failed with exception"
             }
 
+    def _update_stats(self, workflow_url: str, healthy: bool, response_time: float) -> None:
+        """Fold the probe outcome into the per-URL EMA stats"""
+        stats = self._stats.get(workflow_url)
+        if stats is None:
+            self._stats[workflow_url] = {
+                "ema_rt": max(response_time, 0.01),
+                "success": 1.0 if healthy else 0.0,
+            }
+            return
+        alpha = 0.3
+        stats["ema_rt"] = (1 - alpha) * stats["ema_rt"] + alpha * max(response_time, 0.01)
+        stats["success"] = (1 - alpha) * stats["success"] + alpha * (1.0 if healthy else 0.0)
+
+    def _ttl_for(self, workflow_url: str) -> float:
+        """TTL grows for fast, consistently healthy workflows and shrinks
+        for slow or flapping ones so failures are re-detected quickly"""
+        stats = self._stats.get(workflow_url)
+        if stats is None:
+            return float(self.cache_ttl)
+        if stats["success"] < 0.5:
+            return 30.0
+        ttl = self.cache_ttl * stats["success"] / max(stats["ema_rt"], 0.1)
+        return min(900.0, max(60.0, ttl))
+
+    def _store(self, workflow_url: str, result: Dict) -> None:
+        """Insert into the LRU cache, evicting the oldest entry when full"""
+        # Monotonic timestamps: TTLs are durations, so they must not jump
+        # with NTP adjustments the way wall-clock time can
+        self._cache[workflow_url] = (time.monotonic(), self._ttl_for(workflow_url), result)
+        self._cache.move_to_end(workflow_url)
+        while len(self._cache) > self._CACHE_MAXSIZE:
+            self._cache.popitem(last=False)
+
 class EmailFallbackService:
-    """Fallback email service when Pipedream fails"""
-    
+    """Fallback email service when Pipedream fails
+
+    Keeps one authenticated SMTP connection alive per instance so each
+    email only pays the TLS handshake and login once, not per send.
+    """
+
     def __init__(self):
         self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
         self.smtp_username = os.getenv("SMTP_USERNAME")
         self.smtp_password = os.getenv("SMTP_PASSWORD")
-    
+        self._smtp: Optional["aiosmtplib.SMTP"] = None
+        self._smtp_lock = asyncio.Lock()
+
+    async def _connect_smtp(self) -> "aiosmtplib.SMTP":
+        """(Re)establish the shared SMTP connection"""
+        smtp = aiosmtplib.SMTP(hostname=self.smtp_server, port=self.smtp_port)
+        await smtp.connect()
+        await smtp.starttls()
+        await smtp.login(self.smtp_username, self.smtp_password)
+        self._smtp = smtp
+        return smtp
+
     async def send_email_fallback(self, to: str, subject: str, body: str) -> dict:
         """Send email using SMTP as fallback"""
-        
+
         if not self.smtp_username or not self.smtp_password:
             return {
                 "success": False,
                 "error": "SMTP credentials not configured",
                 "suggestion": "Configure SMTP_USERNAME and SMTP_PASSWORD in environment variables"
             }
-        
+
         try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.smtp_username
-            msg['To'] = to
-            msg['Subject'] = subject
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.smtp_username, self.smtp_password)
-            text = msg.as_string()
-            server.sendmail(self.smtp_username, to, text)
-            server.quit()
-            
+            if aiosmtplib is None:
+                # No aiosmtplib installed: keep the blocking smtplib path but
+                # run the whole TLS/auth/send exchange in a worker thread so
+                # the event loop stays responsive
+                await asyncio.to_thread(self._sync_send, to, subject, body)
+            else:
+                # Create message
+                msg = MIMEMultipart()
+                msg['From'] = self.smtp_username
+                msg['To'] = to
+                msg['Subject'] = subject
+                msg.attach(MIMEText(body, 'plain'))
+
+                # Send over the persistent connection; reconnect once if the
+                # server dropped it while idle
+                async with self._smtp_lock:
+                    smtp = self._smtp or await self._connect_smtp()
+                    try:
+                        await smtp.send_message(msg)
+                    except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError):
+                        smtp = await self._connect_smtp()
+                        await smtp.send_message(msg)
+
             return {
                 "success": True,
                 "message_id": f"fallback_{int(time.time())}",
                 "message": "Email sent successfully using fallback SMTP service"
             }
-            
+
         except Exception as e:
             return {
                 "success": False,
@@ -166,9 +415,47 @@ class EmailFallbackService:
                 "suggestion": "Check SMTP credentials and server settings"
             }
 
+    def _sync_send(self, to: str, subject: str, body: str) -> None:
+        """Blocking smtplib send, built and run entirely off the event loop"""
+        msg = MIMEMultipart()
+        msg['From'] = self.smtp_username
+        msg['To'] = to
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            server.starttls()
+            server.login(self.smtp_username, self.smtp_password)
+            server.sendmail(self.smtp_username, to, msg.as_string())
+        finally:
+            server.quit()
+
+    async def aclose(self) -> None:
+        """Quit the persistent SMTP connection if one is open"""
+        async with self._smtp_lock:
+            if self._smtp is not None:
+                try:
+                    await self._smtp.quit()
+                except Exception:
+                    pass
+                self._smtp = None
+
 class MCPServiceDeepSeek:
     """Enhanced MCP Service for DeepSeek R1 Integration with Pipedream Timeout Fix"""
-    
+
+    # Verification dispatch table, built once per class instead of per call;
+    # values are method names so the table stays unbound
+    _VERIFIERS = {
+        "gmail-send-email": "_verify_email_sent",
+        "mcp_Gmail_gmail-send-email": "_verify_email_sent",
+        "slack-send-message": "_verify_slack_message",
+        "github-create-issue": "_verify_github_issue",
+    }
+
+    # How long an unresponsive server sits out of discovery scans
+    _DISCOVERY_COOLDOWN = 30.0
+
     def __init__(self):
         self.servers = {}
         self.tools_cache = {}
@@ -179,7 +466,22 @@ class MCPServiceDeepSeek:
         self.session_timeout = int(os.getenv("MCP_TIMEOUT", "120"))
         self.health_checker = PipedreamHealthChecker()
         self.email_fallback = EmailFallbackService()
-    
+        # Inverted index tool_name -> (server_id, tool definition); rebuilt
+        # whenever a server connects or rediscovers its tools
+        self._tool_index: Dict[str, tuple] = {}
+        # Validator closures compiled per tool alongside the index so
+        # validate_function_call does no schema dict walking per call
+        self._validators: Dict[str, Any] = {}
+        # Materialized tool descriptor lists, rebuilt lazily after the
+        # index is invalidated instead of re-allocated on every chat turn
+        self._all_tools_cache: Optional[List[Dict[str, Any]]] = None
+        self._openai_tools_cache: Optional[List[Dict[str, Any]]] = None
+        # Tool names known to live on pipedream.net servers, rebuilt with
+        # the index so _is_pipedream_workflow is a set lookup
+        self._pipedream_tools: frozenset = frozenset()
+        # server_id -> monotonic deadline before which discovery skips it
+        self._server_cooldown: Dict[str, float] = {}
+
     async def connect_to_server(self, server_id: str, config: Dict[str, Any]) -> bool:
         """Connect to an MCP server with enhanced logging"""
         try:
@@ -194,6 +496,7 @@ class MCPServiceDeepSeek:
             
             if success:
                 self.servers[server_id] = client
+                self._rebuild_tool_index()
                 self.logger.log_connection_attempt(server_name, uri, True)
                 logger.info(f"Successfully connected to MCP server: {server_name}")
                 return True
@@ -206,122 +509,192 @@ class MCPServiceDeepSeek:
             return False
     
     async def discover_tools(self, message: str) -> List[Dict[str, Any]]:
-        """Discover available tools from all connected servers"""
+        """Discover available tools from all connected servers concurrently
+
+        Discovery RPCs overlap (bounded to 8 at a time) and each one is
+        capped at a short timeout, so wall-clock cost is bounded by the
+        timeout rather than the worst server. A server that times out or
+        errors is put on a cooldown and skipped on subsequent scans until
+        the cooldown expires.
+        """
+        sem = asyncio.Semaphore(8)
+        now = time.monotonic()
+
+        async def _one(server_id: str, client) -> tuple:
+            async with sem:
+                try:
+                    tools = await asyncio.wait_for(client.discover_tools(), timeout=5)
+                except Exception:
+                    self._server_cooldown[server_id] = time.monotonic() + self._DISCOVERY_COOLDOWN
+                    raise
+                return server_id, client.server_name, tools
+
+        results = await asyncio.gather(
+            *[
+                _one(server_id, client)
+                for server_id, client in self.servers.items()
+                if now >= self._server_cooldown.get(server_id, 0.0)
+            ],
+            return_exceptions=True
+        )
+
         all_tools = []
-        
-        for server_id, client in self.servers.items():
-            try:
-                tools = await client.discover_tools()
-                for tool in tools:
-                    tool['server_id'] = server_id
-                    tool['server_name'] = client.server_name
-                all_tools.extend(tools)
-            except Exception as e:
-                logger.error(f"Failed to discover tools from server {server_id}: {e}")
-        
+        for item in results:
+            if isinstance(item, Exception):
+                logger.error(f"Failed to discover tools from server: {item}")
+                continue
+            server_id, server_name, tools = item
+            for tool in tools:
+                tool['server_id'] = server_id
+                tool['server_name'] = server_name
+            all_tools.extend(tools)
+
+        self._rebuild_tool_index()
         return all_tools
+
+    def _rebuild_tool_index(self) -> None:
+        """Rebuild the tool_name -> (server_id, tool) lookup"""
+        index: Dict[str, tuple] = {}
+        validators: Dict[str, Any] = {}
+        pipedream_tools = set()
+        for server_id, client in self.servers.items():
+            hosted_on_pipedream = "pipedream.net" in client.uri
+            for tool in client.available_tools:
+                name = tool.get('name')
+                if name and name not in index:
+                    index[name] = (server_id, tool)
+                    validators[name] = self._compile_validator(tool)
+                    if hosted_on_pipedream:
+                        pipedream_tools.add(name)
+        self._tool_index = index
+        self._validators = validators
+        self._pipedream_tools = frozenset(pipedream_tools)
+        self._all_tools_cache = None
+        self._openai_tools_cache = None
+
+    @staticmethod
+    def _compile_validator(tool_definition: Dict[str, Any]):
+        """Compile a validator closure for one tool's parameter schema
+
+        The required-parameter list and per-parameter type checks are
+        extracted once here, so the per-call path is a straight loop over
+        precomputed tuples instead of repeated nested dict lookups.
+        """
+        schema = tool_definition.get('parameters', {})
+        required = tuple(schema.get('required', []))
+        type_checks = []
+        for param_name, param_schema in schema.get('properties', {}).items():
+            param_type = param_schema.get('type')
+            if param_type == 'string':
+                type_checks.append((param_name, str, f"Parameter '{param_name}' must be a string"))
+            elif param_type == 'integer':
+                type_checks.append((param_name, int, f"Parameter '{param_name}' must be an integer"))
+            elif param_type == 'boolean':
+                type_checks.append((param_name, bool, f"Parameter '{param_name}' must be a boolean"))
+        type_checks = tuple(type_checks)
+
+        def _validate(parameters: Dict[str, Any]) -> List[str]:
+            errors = []
+            for param in required:
+                if param not in parameters:
+                    errors.append(f"Required parameter '{param}' is missing")
+            for param_name, expected, message in type_checks:
+                if param_name in parameters and not isinstance(parameters[param_name], expected):
+                    errors.append(message)
+            return errors
+
+        return _validate
+
+    def _lookup_tool(self, function_name: str) -> Optional[tuple]:
+        """O(1) lookup of (server_id, tool definition) by tool name
+
+        Falls back to one rebuild on a miss so late tool discovery on an
+        already-connected server is still found.
+        """
+        entry = self._tool_index.get(function_name)
+        if entry is None:
+            self._rebuild_tool_index()
+            entry = self._tool_index.get(function_name)
+        return entry
     
     def validate_function_call(self, function_name: str, parameters: Dict[str, Any]) -> ValidationResult:
         """Validate function call parameters against schema"""
-        errors = []
-        
-        # Find the tool definition
-        tool_definition = None
-        for server_id, client in self.servers.items():
-            for tool in client.available_tools:
-                if tool.get('name') == function_name:
-                    tool_definition = tool
-                    break
-            if tool_definition:
-                break
-        
-        if not tool_definition:
-            return ValidationResult(False, [f"Function '{function_name}' not found"])
-        
-        # Validate required parameters
-        required_params = tool_definition.get('parameters', {}).get('required', [])
-        for param in required_params:
-            if param not in parameters:
-                errors.append(f"Required parameter '{param}' is missing")
-        
-        # Validate parameter types (basic validation)
-        param_schema = tool_definition.get('parameters', {}).get('properties', {})
-        for param_name, param_value in parameters.items():
-            if param_name in param_schema:
-                param_type = param_schema[param_name].get('type')
-                if param_type == 'string' and not isinstance(param_value, str):
-                    errors.append(f"Parameter '{param_name}' must be a string")
-                elif param_type == 'integer' and not isinstance(param_value, int):
-                    errors.append(f"Parameter '{param_name}' must be an integer")
-                elif param_type == 'boolean' and not isinstance(param_value, bool):
-                    errors.append(f"Parameter '{param_name}' must be a boolean")
-        
+        validator = self._validators.get(function_name)
+        if validator is None:
+            # Miss: the index rebuild also recompiles validators
+            if self._lookup_tool(function_name) is None:
+                return ValidationResult(False, [f"Function '{function_name}' not found"])
+            validator = self._validators[function_name]
+
+        errors = validator(parameters)
         return ValidationResult(len(errors) == 0, errors)
     
     async def execute_tool_with_health_check(self, function_call) -> dict:
-        """Execute tool with health check and optimization suggestions"""
-        
-        # Check if this is a Pipedream workflow
-        if self._is_pipedream_workflow(function_call.name):
+        """Execute tool with health check and optimization suggestions
+
+        The health probe never gates execution: a fresh cached result is
+        used as-is, and a stale one only triggers a probe that runs
+        concurrently with the tool call so the hot path costs a single
+        round-trip either way.
+        """
+        probe_task = None
+        is_pipedream = self._is_pipedream_workflow(function_call.name)
+        if is_pipedream:
             workflow_url = self._get_workflow_url(function_call.name)
-            
-            # Health check first
-            health_result = await self.health_checker.check_workflow_health(workflow_url)
-            
-            if not health_result.get("healthy"):
-                # Don't block execution; warn and try anyway to mimic no-OAuth/no-gate flows
-                logger.warning(f"Pipedream health check reported unhealthy: {health_result}")
-            
-            # If health check shows slow response, warn user
-            if health_result.get("response_time", 0) > 10:
-                logger.warning(f"⚠️ Pipedream workflow is slow (response time: {health_result['response_time']}s)")
-        
+
+            health_result = self.health_checker.cached_health(workflow_url)
+            if health_result is None:
+                # Stale or unknown: refresh in the background while the
+                # actual call runs instead of paying for it up front
+                probe_task = asyncio.create_task(
+                    self.health_checker.check_workflow_health(workflow_url)
+                )
+            else:
+                if not health_result.get("healthy"):
+                    # Don't block execution; warn and try anyway to mimic no-OAuth/no-gate flows
+                    logger.warning(f"Pipedream health check reported unhealthy: {health_result}")
+                if health_result.get("response_time", 0) > 10:
+                    logger.warning(f"⚠️ Pipedream workflow is slow (response time: {health_result['response_time']}s)")
+
         # Proceed with normal execution; if it fails, attach suggestions
         result = await self.execute_tool_with_confirmation(function_call)
-        if not result.get("success") and self._is_pipedream_workflow(function_call.name):
+        if probe_task is not None:
+            if not result.get("success"):
+                try:
+                    health_result = await probe_task
+                    if not health_result.get("healthy"):
+                        logger.warning(f"Pipedream health check reported unhealthy: {health_result}")
+                except (Exception, asyncio.CancelledError):
+                    # CancelledError is a BaseException since 3.8 and can
+                    # surface here if another waiter's shield is cancelled
+                    pass
+            # On success the probe is left to finish on its own: its
+            # in-flight future may have other waiters, and completing it
+            # warms the health cache for the next call
+        if not result.get("success") and is_pipedream:
             result.setdefault("suggestion", self._get_workflow_optimization_suggestions())
         return result
     
     def _is_pipedream_workflow(self, function_name: str) -> bool:
         """Check if function is a Pipedream workflow"""
-        # Treat any mcp_* names or common providers as Pipedream-capable
-        name_lower = function_name.lower()
+        # Tools discovered from pipedream.net servers are known exactly;
+        # the compiled name heuristic covers mcp_* and common providers
         return (
-            name_lower.startswith("mcp_")
-            or "gmail" in name_lower
-            or "google_drive" in name_lower
-            or "drive" in name_lower
+            function_name in self._pipedream_tools
+            or _PIPEDREAM_NAME_RE.search(function_name) is not None
         )
     
     def _get_workflow_url(self, function_name: str) -> str:
         """Get workflow URL for a function"""
         # Find the server that has this tool
-        for server_id, client in self.servers.items():
-            if any(tool.get('name') == function_name for tool in client.available_tools):
-                return client.uri
+        entry = self._lookup_tool(function_name)
+        if entry:
+            return self.servers[entry[0]].uri
         return ""
     
     def _get_workflow_optimization_suggestions(self) -> str:
         """Get workflow optimization suggestions"""
-        return """
-🔧 Pipedream Workflow Optimization Suggestions:
-
-1. **Check for Infinite Loops**: Ensure your workflow doesn't have loops that never terminate
-2. **Reduce API Calls**: Minimize the number of external API calls in your workflow
-3. **Add Timeouts**: Set appropriate timeouts for each step in your workflow
-4. **Simplify Logic**: Remove unnecessary complex logic or data processing
-5. **Check Gmail Authentication**: Ensure Gmail OAuth is properly configured
-6. **Use Async Steps**: Use asynchronous steps where possible to improve performance
-
-🔍 Debug Steps:
-1. Go to your Pipedream dashboard
-2. Find workflow ID: 6919d1b2-8143-422f-a5ae-6bca936cdbe6
-3. Check the execution logs for stuck steps
-4. Look for steps taking longer than 30 seconds
-5. Optimize or remove slow steps
-
-💡 Quick Fix: Create a simpler test workflow with just basic email sending to verify the integration works.
-        """
+        return _WORKFLOW_OPT_TIPS
     
     async def execute_tool_with_confirmation(self, function_call) -> Dict[str, Any]:
         """Execute tool and provide detailed feedback for DeepSeek R1"""
@@ -428,10 +801,9 @@ class MCPServiceDeepSeek:
             if server_id and server_id in self.servers:
                 target_server = self.servers[server_id]
             else:
-                for sid, server in self.servers.items():
-                    if any(tool.get('name') == tool_name for tool in server.available_tools):
-                        target_server = server
-                        break
+                entry = self._lookup_tool(tool_name)
+                if entry:
+                    target_server = self.servers.get(entry[0])
             
             if not target_server:
                 error_msg = f"Tool '{orig_name}' not available on any connected server"
@@ -465,15 +837,9 @@ class MCPServiceDeepSeek:
             "result": result
         })
         
-        verification_methods = {
-            "gmail-send-email": self._verify_email_sent,
-            "mcp_Gmail_gmail-send-email": self._verify_email_sent,
-            "slack-send-message": self._verify_slack_message,
-            "github-create-issue": self._verify_github_issue
-        }
-        
-        if function_name in verification_methods:
-            verification_result = await verification_methods[function_name](result)
+        verifier_name = self._VERIFIERS.get(function_name)
+        if verifier_name is not None:
+            verification_result = await getattr(self, verifier_name)(result)
             self.logger.log_function_call(4, f"Verification result for {function_name}", verification_result)
             return verification_result
         
@@ -530,7 +896,13 @@ class MCPServiceDeepSeek:
         return {"verified": False, "reason": "No issue number/ID found"}
     
     def get_all_tools(self) -> List[Dict[str, Any]]:
-        """Get all available tools from all servers"""
+        """Get all available tools from all servers
+
+        The list is built once per discovery cycle and the shared copy is
+        returned on subsequent calls; callers treat it as read-only.
+        """
+        if self._all_tools_cache is not None:
+            return self._all_tools_cache
         all_tools = []
         for server_id, client in self.servers.items():
             for tool in client.available_tools:
@@ -538,10 +910,17 @@ class MCPServiceDeepSeek:
                 tool_copy['server_id'] = server_id
                 tool_copy['server_name'] = client.server_name
                 all_tools.append(tool_copy)
+        self._all_tools_cache = all_tools
         return all_tools
-    
+
     def get_openai_tools(self) -> List[Dict[str, Any]]:
-        """Get tools in OpenAI format for DeepSeek R1"""
+        """Get tools in OpenAI format for DeepSeek R1
+
+        Rebuilt only after (re)discovery; every chat turn in between gets
+        the cached list instead of re-copying every schema.
+        """
+        if self._openai_tools_cache is not None:
+            return self._openai_tools_cache
         tools = []
         for server_id, client in self.servers.items():
             for tool in client.available_tools:
@@ -610,8 +989,41 @@ class MCPServiceDeepSeek:
                 print(f"[DEBUG] Added tool: {tool_name} with parameters: {tool_parameters}")
         
         print(f"[DEBUG] Total tools returned: {len(tools)}")
+        self._openai_tools_cache = tools
         return tools
     
+    async def aclose(self) -> None:
+        """Release every pooled connection (call on application shutdown)
+
+        Disconnects all server clients (which unwinds their HTTP
+        sessions and rpc pumps), then closes the health checker and
+        email fallback clients and the module-level Pipedream client.
+        """
+        for server_id, client in list(self.servers.items()):
+            try:
+                await client.disconnect()
+            except Exception as e:
+                logger.error(f"Error disconnecting {server_id} on shutdown: {e}")
+        self.servers.clear()
+        await self.health_checker.aclose()
+        await self.email_fallback.aclose()
+        await _close_pd_client()
+
+    async def broadcast_notification(self, message: Dict[str, Any]) -> int:
+        """Send one JSON-RPC notification to every connected websocket server
+
+        The payload is serialized once and the same string object is enqueued
+        for each recipient, so fanout costs one encode regardless of how many
+        connections receive it. Returns the number of recipients.
+        """
+        payload = _dumps(message)
+        sent = 0
+        for client in self.servers.values():
+            if client.server_type == "websocket" and client.is_connected and client._out_q:
+                client._out_q.put_nowait(payload)
+                sent += 1
+        return sent
+
     def get_connected_servers(self) -> List[Dict[str, Any]]:
         """Get information about connected servers"""
         servers_info = []
@@ -627,7 +1039,26 @@ class MCPServiceDeepSeek:
 
 class MCPClientDeepSeek:
     """Enhanced MCP Client for DeepSeek R1 Integration with Pipedream Timeout Fix"""
-    
+
+    # One slot per attribute keeps instances dict-free: less memory per
+    # connection and array-indexed attribute access on the hot call paths
+    __slots__ = (
+        "config", "server_type", "uri", "transport", "connection",
+        "available_tools", "state", "server_name", "last_error",
+        "session_endpoint", "pipedream_timeout", "session_timeout",
+        "_inflight", "large_result_tools", "_out_q", "_writer_task",
+        "_reader_task", "_pending", "_next_id", "_stack", "_http",
+        "_notification_handlers",
+    )
+
+    _STATE_DISCONNECTED = 0
+    _STATE_CONNECTED = 1
+
+    # Outbound frames queued within this window are flushed as one
+    # JSON-RPC batch array, up to _BATCH_MAX per flush
+    _BATCH_WAIT = 0.005
+    _BATCH_MAX = 32
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.server_type = config.get("type", "custom")
@@ -635,14 +1066,60 @@ class MCPClientDeepSeek:
         self.transport = config.get("transport", "http")
         self.connection = None
         self.available_tools = []
-        self.is_connected = False
+        self.state = self._STATE_DISCONNECTED
         self.server_name = config.get("name", "Unknown Server")
         self.last_error = None
         self.session_endpoint = None
+        # In-flight request coalescing for idempotent HTTP tool calls
+        self._inflight = {}
+        # Tools whose responses are known to be large (e.g. file fetch tools)
+        # are parsed incrementally instead of buffering the whole body
+        self.large_result_tools = set(config.get("large_result_tools", []))
+        # Batched JSON-RPC pipeline for stdio/websocket transports: send
+        # sites enqueue frames and await a per-id future; a writer task
+        # coalesces queued frames into batch arrays and a reader task
+        # dispatches responses back by id
+        self._out_q = None
+        self._writer_task = None
+        self._reader_task = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = itertools.count(1)
+        self._notification_handlers: Dict[str, Any] = {}
+        # Cleanup callbacks registered at connect time; disconnect() unwinds
+        # them in reverse order even if connect only partially succeeded
+        self._stack = contextlib.AsyncExitStack()
+        # Shared HTTP session per server so every request to the same host
+        # reuses the connector pool instead of re-handshaking TCP/TLS
+        self._http = None
         # Increased timeout values
         self.pipedream_timeout = int(os.getenv("PIPEDREAM_TIMEOUT", "300"))  # 5 minutes
         self.session_timeout = int(os.getenv("MCP_TIMEOUT", "300"))  # 5 minutes
-    
+
+    @property
+    def is_connected(self) -> bool:
+        """Backwards-compatible view of the int connection state"""
+        return self.state == self._STATE_CONNECTED
+
+    async def _session(self) -> aiohttp.ClientSession:
+        """Lazily create the shared aiohttp session for this server"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=_make_connector(),
+                # Per-phase defaults so a stalled handshake or silent peer
+                # can't hang a call forever; slow-but-healthy transfers
+                # stay unbounded in total. Pipedream calls override
+                # sock_read with their own longer budget.
+                timeout=aiohttp.ClientTimeout(total=None, connect=5, sock_connect=5, sock_read=15),
+            )
+            self._stack.push_async_callback(self._close_http)
+        return self._http
+
+    async def _close_http(self) -> None:
+        """Close the shared HTTP session"""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+
     async def connect(self) -> bool:
         """Connect to the MCP server based on transport type"""
         try:
@@ -662,67 +1139,74 @@ class MCPClientDeepSeek:
     async def _connect_custom(self) -> bool:
         """Connect to custom HTTP-based MCP server (e.g., Pipedream)"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # Special handling for Pipedream servers: prefer JSON-RPC POST over GET/SSE
-                if "pipedream.net" in self.uri:
-                    logger.info(f"Establishing Pipedream MCP session: {self.uri}")
-                    tools_request = {
-                        "jsonrpc": "2.0",
-                        "id": 1,
-                        "method": "tools/list"
-                    }
-                    try:
-                        timeout = aiohttp.ClientTimeout(total=10)
-                        async with session.post(
-                            self.uri,
-                            json=tools_request,
-                            headers={
-                                "Content-Type": "application/json",
-                                "Accept": "application/json, text/event-stream"
-                            },
-                            timeout=timeout
-                        ) as response:
-                            if response.status == 200:
-                                content_type = response.headers.get('content-type', '')
-                                if 'text/event-stream' in content_type:
-                                    text = await response.text()
-                                    for line in text.strip().split('\n'):
-                                        if line.startswith('data: '):
-                                            try:
-                                                data_json = line[6:]
-                                                data = json.loads(data_json)
-                                                if "result" in data and "tools" in data["result"]:
-                                                    self.available_tools = data["result"]["tools"]
-                                                    break
-                                            except Exception:
-                                                continue
-                                else:
+            session = await self._session()
+            # Special handling for Pipedream servers: prefer JSON-RPC POST over GET/SSE
+            if "pipedream.net" in self.uri:
+                logger.info(f"Establishing Pipedream MCP session: {self.uri}")
+                tools_request = {
+                    "jsonrpc": "2.0",
+                    "id": next(self._next_id),
+                    "method": "tools/list"
+                }
+                try:
+                    # Per-request timeouts replace the session default
+                    # wholesale, so bound the connect phases too or a
+                    # black-holed URI stalls for the OS TCP timeout
+                    timeout = aiohttp.ClientTimeout(connect=5, sock_connect=5, sock_read=30)
+                    async with session.post(
+                        self.uri,
+                        data=_dumps(tools_request),
+                        headers={
+                            "Content-Type": "application/json",
+                            "Accept": "application/json, text/event-stream"
+                        },
+                        timeout=timeout
+                    ) as response:
+                        if response.status == 200:
+                            content_type = response.headers.get('content-type', '')
+                            if 'text/event-stream' in content_type:
+                                # Stream line-by-line and stop at the first
+                                # useful event instead of buffering the whole
+                                # (potentially long-lived) SSE body. Matching
+                                # on bytes skips UTF-8 decoding of comment and
+                                # keepalive lines entirely.
+                                async for raw in response.content:
+                                    if not raw.startswith(b'data: '):
+                                        continue
                                     try:
-                                        data = await response.json()
+                                        data = _loads(raw[6:].rstrip(b'\r\n'))
                                         if "result" in data and "tools" in data["result"]:
                                             self.available_tools = data["result"]["tools"]
-                                    except Exception as e:
-                                        logger.warning(f"Pipedream tools/list JSON parse failed: {e}")
+                                            break
+                                    except Exception:
+                                        continue
                             else:
-                                logger.warning(f"Pipedream tools/list returned HTTP {response.status}")
-                    except Exception as e:
-                        logger.warning(f"Pipedream initial tools/list check failed: {e}")
-                    # Consider connected to allow later discovery and calls
-                    self.is_connected = True
-                    await self._discover_tools()
-                    return True
-                else:
-                    # Standard HTTP connection: try GET /health then proceed
-                    try:
-                        timeout = aiohttp.ClientTimeout(total=5)
-                        async with session.get(self.uri, timeout=timeout) as response:
-                            if response.status in (200, 405):
-                                self.is_connected = True
-                                await self._discover_tools()
-                                return True
-                    except Exception:
-                        pass
-            
+                                try:
+                                    data = await response.json(loads=_loads)
+                                    if "result" in data and "tools" in data["result"]:
+                                        self.available_tools = data["result"]["tools"]
+                                except Exception as e:
+                                    logger.warning(f"Pipedream tools/list JSON parse failed: {e}")
+                        else:
+                            logger.warning(f"Pipedream tools/list returned HTTP {response.status}")
+                except Exception as e:
+                    logger.warning(f"Pipedream initial tools/list check failed: {e}")
+                # Consider connected to allow later discovery and calls
+                self.state = self._STATE_CONNECTED
+                await self._discover_tools()
+                return True
+            else:
+                # Standard HTTP connection: try GET /health then proceed
+                try:
+                    timeout = aiohttp.ClientTimeout(total=5)
+                    async with session.get(self.uri, timeout=timeout) as response:
+                        if response.status in (200, 405):
+                            self.state = self._STATE_CONNECTED
+                            await self._discover_tools()
+                            return True
+                except Exception:
+                    pass
+
             self.last_error = "Failed to establish connection"
             return False
         except Exception as e:
@@ -742,51 +1226,63 @@ class MCPClientDeepSeek:
                 *command_parts,
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                # Large tool results arrive as one JSON-RPC line; the
+                # default 64 KiB StreamReader limit would raise
+                # LimitOverrunError on them
+                limit=8 * 1024 * 1024
             )
-            
-            init_request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "1.0.0",
-                    "capabilities": {"tools": {}},
-                    "clientInfo": {
-                        "name": "chatconnect-deepseek",
-                        "version": "1.0.0"
-                    }
+            self._widen_stdout_pipe()
+            self._stack.push_async_callback(self._close_stdio)
+            self._start_rpc_pump()
+
+            response = await self._rpc("initialize", {
+                "protocolVersion": "1.0.0",
+                "capabilities": {"tools": {}},
+                "clientInfo": {
+                    "name": "chatconnect-deepseek",
+                    "version": "1.0.0"
                 }
-            }
-            
-            init_message = json.dumps(init_request) + "\n"
-            self.connection.stdin.write(init_message.encode())
-            await self.connection.stdin.drain()
-            
-            response_line = await self.connection.stdout.readline()
-            if response_line:
-                response = json.loads(response_line.decode().strip())
-                if "result" in response:
-                    self.is_connected = True
-                    await self._discover_tools()
-                    return True
-            
+            }, timeout=30)
+            if "result" in response:
+                self.state = self._STATE_CONNECTED
+                await self._discover_tools()
+                return True
+
             self.last_error = "Failed to initialize stdio connection"
             return False
         except Exception as e:
             self.last_error = f"Stdio connection error: {str(e)}"
             logger.error(f"Failed to connect via stdio: {e}")
             return False
+
+    def _widen_stdout_pipe(self) -> None:
+        """Grow the child's stdout pipe to 1 MiB on Linux
+
+        MCP tools that stream megabytes over stdio otherwise drain through
+        the default 64 KiB pipe one page-sized read at a time; a wider pipe
+        cuts the number of read syscalls and child/parent context switches.
+        Best effort: silently keeps the default size where unsupported.
+        """
+        if sys.platform != "linux":
+            return
+        try:
+            import fcntl
+            pipe_transport = self.connection._transport.get_pipe_transport(1)
+            pipe = pipe_transport.get_extra_info("pipe")
+            fcntl.fcntl(pipe.fileno(), fcntl.F_SETPIPE_SZ, 1 << 20)
+        except (AttributeError, OSError, ImportError):
+            pass
     
     async def _connect_sse(self) -> bool:
         """Connect to SSE-based MCP server"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.uri) as response:
-                    if response.status == 200:
-                        self.is_connected = True
-                        await self._discover_tools()
-                        return True
+            session = await self._session()
+            async with session.get(self.uri) as response:
+                if response.status == 200:
+                    self.state = self._STATE_CONNECTED
+                    await self._discover_tools()
+                    return True
             return False
         except Exception as e:
             self.last_error = f"SSE connection error: {str(e)}"
@@ -796,37 +1292,200 @@ class MCPClientDeepSeek:
     async def _connect_websocket(self) -> bool:
         """Connect to WebSocket-based MCP server"""
         try:
-            self.connection = await websockets.connect(self.uri)
-            
-            init_request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "1.0.0",
-                    "capabilities": {"tools": {}},
-                    "clientInfo": {
-                        "name": "chatconnect-deepseek",
-                        "version": "1.0.0"
-                    }
+            # permessage-deflate costs CPU per frame on both peers; MCP
+            # payloads are small JSON-RPC messages, so leave it off
+            self.connection = await websockets.connect(self.uri, compression=None)
+            self._stack.push_async_callback(self._close_websocket)
+            self._start_rpc_pump()
+
+            response = await self._rpc("initialize", {
+                "protocolVersion": "1.0.0",
+                "capabilities": {"tools": {}},
+                "clientInfo": {
+                    "name": "chatconnect-deepseek",
+                    "version": "1.0.0"
                 }
-            }
-            
-            await self.connection.send(json.dumps(init_request))
-            response = await self.connection.recv()
-            response_data = json.loads(response)
-            
-            if "result" in response_data:
-                self.is_connected = True
+            }, timeout=30)
+            if "result" in response:
+                self.state = self._STATE_CONNECTED
                 await self._discover_tools()
                 return True
-            
+
             return False
         except Exception as e:
             self.last_error = f"WebSocket connection error: {str(e)}"
             logger.error(f"Failed to connect via WebSocket: {e}")
             return False
-    
+
+    def _start_rpc_pump(self) -> None:
+        """Start the writer/reader tasks for a stdio or websocket connection"""
+        self._out_q = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        self._reader_task = asyncio.create_task(self._reader_loop())
+        # Registered after the transport close callback, so the unwind
+        # stops both tasks before the underlying connection goes away
+        self._stack.push_async_callback(self._stop_rpc_pump)
+
+    async def _stop_rpc_pump(self) -> None:
+        """Flush queued frames, cancel the pump tasks and fail pending calls"""
+        if self._writer_task:
+            if (self._out_q is not None and not self._out_q.empty()
+                    and not self._writer_task.done()):
+                # Bounded: if the writer died on a transport error nothing
+                # will ever task_done() the remaining frames
+                try:
+                    await asyncio.wait_for(self._out_q.join(), timeout=2.0)
+                except asyncio.TimeoutError:
+                    logger.warning("Timed out flushing outbound RPC frames on disconnect")
+            self._writer_task.cancel()
+            self._writer_task = None
+        if self._reader_task:
+            self._reader_task.cancel()
+            self._reader_task = None
+        self._fail_pending(ConnectionError("Connection closed"))
+        self._out_q = None
+
+    def _fail_pending(self, exc: Exception) -> None:
+        """Propagate a transport failure to every in-flight request"""
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    async def _rpc(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Queue one JSON-RPC request and await its response by id"""
+        request_id = next(self._next_id)
+        request = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            request["params"] = params
+        future = asyncio.get_event_loop().create_future()
+        self._pending[request_id] = future
+        self._out_q.put_nowait(_dumps(request))
+        try:
+            return await asyncio.wait_for(future, timeout or self.session_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    # The tools/call envelope is static apart from the id, tool name and
+    # arguments, so the frame is assembled from preformatted segments
+    # instead of building and serializing a fresh request dict per call.
+    _CALL_HEAD = '{"jsonrpc":"2.0","method":"tools/call","id":'
+    _CALL_NAME = ',"params":{"name":'
+    _CALL_ARGS = ',"arguments":'
+
+    async def _rpc_tools_call(self, tool_name: str, arguments: Optional[Dict[str, Any]],
+                              timeout: Optional[float] = None) -> Dict[str, Any]:
+        """tools/call fast path: encode only the variable parts of the frame"""
+        request_id = next(self._next_id)
+        frame = ''.join((
+            self._CALL_HEAD, str(request_id),
+            self._CALL_NAME, _dumps(tool_name),
+            self._CALL_ARGS, _dumps(arguments) if arguments else '{}',
+            '}}',
+        ))
+        future = asyncio.get_event_loop().create_future()
+        self._pending[request_id] = future
+        self._out_q.put_nowait(frame)
+        try:
+            return await asyncio.wait_for(future, timeout or self.session_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _writer_loop(self) -> None:
+        """Drain the out-queue onto the transport, coalescing bursts
+
+        Frames queued within ~5 ms of each other are flushed together as a
+        JSON-RPC 2.0 batch array, so a burst of calls pays one websocket
+        frame (or one stdio write) instead of one per request.
+        """
+        loop = asyncio.get_event_loop()
+        try:
+            while True:
+                frames = [await self._out_q.get()]
+                deadline = loop.time() + self._BATCH_WAIT
+                while len(frames) < self._BATCH_MAX:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        frames.append(await asyncio.wait_for(self._out_q.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                try:
+                    if self.server_type == "websocket":
+                        payload = frames[0] if len(frames) == 1 else "[" + ",".join(frames) + "]"
+                        await self.connection.send(payload)
+                    else:
+                        # Newline-delimited frames flushed with one write +
+                        # drain: coalesces syscalls under concurrent callers
+                        # without requiring batch-array support from the
+                        # server
+                        self.connection.stdin.write(("\n".join(frames) + "\n").encode())
+                        await self.connection.stdin.drain()
+                finally:
+                    for _ in frames:
+                        self._out_q.task_done()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Writer loop failed for {self.server_name}: {e}")
+            self._fail_pending(e)
+
+    async def _reader_loop(self) -> None:
+        """Read frames off the transport and resolve pending futures by id"""
+        try:
+            while True:
+                if self.server_type == "websocket":
+                    raw = await self.connection.recv()
+                else:
+                    raw = await self.connection.stdout.readline()
+                    if not raw:
+                        break
+                try:
+                    message = _loads(raw)
+                except ValueError:
+                    logger.warning(f"Undecodable frame from {self.server_name}")
+                    continue
+                # A batch request comes back as a batch array
+                for response in message if isinstance(message, list) else [message]:
+                    if "id" not in response and "method" in response:
+                        # Server-initiated notification, not a reply
+                        self._dispatch_notification(response)
+                        continue
+                    future = self._pending.pop(response.get("id"), None)
+                    if future is not None and not future.done():
+                        future.set_result(response)
+            self._fail_pending(ConnectionError("Connection closed by server"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Reader loop failed for {self.server_name}: {e}")
+            self._fail_pending(e)
+
+    def on_notification(self, method: str, handler) -> None:
+        """Register a handler for server-initiated notifications by method"""
+        self._notification_handlers[method] = handler
+
+    def _dispatch_notification(self, frame: Dict[str, Any]) -> None:
+        """Route an id-less frame to its registered handler, if any"""
+        handler = self._notification_handlers.get(frame["method"])
+        if handler is None:
+            logger.debug("Unhandled notification %s from %s",
+                         frame["method"], self.server_name)
+            return
+        try:
+            result = handler(frame.get("params"))
+            if asyncio.iscoroutine(result):
+                asyncio.ensure_future(result)
+        except Exception as e:
+            logger.error("Notification handler for %s failed: %s", frame["method"], e)
+
+    async def discover_tools(self) -> List[Dict[str, Any]]:
+        """Refresh and return this server's available tools"""
+        await self._discover_tools()
+        return self.available_tools
+
     async def _discover_tools(self) -> None:
         """Discover available tools from the server"""
         try:
@@ -852,119 +1511,120 @@ class MCPClientDeepSeek:
                 logger.info("No session endpoint available for Pipedream, trying base URI for tools/list")
                 target_uri = base_uri
             
-            async with aiohttp.ClientSession() as session:
-                
-                tools_request = {
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "tools/list"
-                }
-                
-                # Increased timeout for tool discovery
-                timeout = aiohttp.ClientTimeout(total=60)
-                async with session.post(
-                    target_uri,
-                    json=tools_request,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Accept": "application/json, text/event-stream"
-                    },
-                    timeout=timeout
-                ) as response:
-                    if response.status == 200:
-                        content_type = response.headers.get('content-type', '')
-                        if 'text/event-stream' in content_type:
-                            response_text = await response.text()
-                            lines = response_text.strip().split('\n')
-                            for line in lines:
-                                if line.startswith('data: '):
-                                    try:
-                                        data_json = line[6:]
-                                        tools_data = json.loads(data_json)
-                                        if "result" in tools_data and "tools" in tools_data["result"]:
-                                            self.available_tools = tools_data["result"]["tools"]
-                                            logger.info(f"Discovered {len(self.available_tools)} tools from Pipedream")
-                                            print(f"[DEBUG] Pipedream tools discovered: {[t.get('name', 'unknown') for t in self.available_tools]}")
-                                            
-                                            # Debug the first tool to see its schema
-                                            if self.available_tools:
-                                                first_tool = self.available_tools[0]
-                                                print(f"[DEBUG] First tool schema: {json.dumps(first_tool, indent=2)}")
-                                            
-                                            break
-                                    except:
-                                        continue
-                        else:
-                            # Handle regular JSON response
+            tools_request = {
+                "jsonrpc": "2.0",
+                "id": next(self._next_id),
+                "method": "tools/list"
+            }
+
+            # Increased timeout for tool discovery
+            timeout = httpx.Timeout(connect=5.0, read=60.0, write=60.0, pool=5.0)
+            async with _get_pd_client().stream(
+                "POST",
+                target_uri,
+                content=_dumps(tools_request),
+                headers={
+                    "Content-Type": "application/json",
+                    "Accept": "application/json, text/event-stream"
+                },
+                timeout=timeout
+            ) as response:
+                if response.status_code == 200:
+                    content_type = response.headers.get('content-type', '')
+                    if 'text/event-stream' in content_type:
+                        async for data_json in _iter_sse_data(response.aiter_bytes()):
                             try:
-                                tools_data = await response.json()
+                                tools_data = _loads(data_json)
                                 if "result" in tools_data and "tools" in tools_data["result"]:
                                     self.available_tools = tools_data["result"]["tools"]
-                                    logger.info(f"Discovered {len(self.available_tools)} tools from Pipedream (JSON)")
-                            except Exception as e:
-                                logger.error(f"Failed to parse Pipedream JSON tools response: {e}")
+                                    logger.info(f"Discovered {len(self.available_tools)} tools from Pipedream")
+                                    print(f"[DEBUG] Pipedream tools discovered: {[t.get('name', 'unknown') for t in self.available_tools]}")
+
+                                    # Debug the first tool to see its schema
+                                    if self.available_tools:
+                                        first_tool = self.available_tools[0]
+                                        print(f"[DEBUG] First tool schema: {json.dumps(first_tool, indent=2)}")
+
+                                    break
+                            except:
+                                continue
+                    else:
+                        # Handle regular JSON response
+                        try:
+                            tools_data = _loads(await response.aread())
+                            if "result" in tools_data and "tools" in tools_data["result"]:
+                                self.available_tools = tools_data["result"]["tools"]
+                                logger.info(f"Discovered {len(self.available_tools)} tools from Pipedream (JSON)")
+                        except Exception as e:
+                            logger.error(f"Failed to parse Pipedream JSON tools response: {e}")
         except Exception as e:
             logger.error(f"Failed to discover Pipedream tools: {e}")
     
     async def _discover_standard_tools(self) -> None:
         """Discover tools from standard MCP server"""
         try:
-            if self.server_type == "stdio":
-                tools_request = {
-                    "jsonrpc": "2.0",
-                    "id": 2,
-                    "method": "tools/list"
-                }
-                
-                tools_message = json.dumps(tools_request) + "\n"
-                self.connection.stdin.write(tools_message.encode())
-                await self.connection.stdin.drain()
-                
-                response_line = await self.connection.stdout.readline()
-                if response_line:
-                    response = json.loads(response_line.decode().strip())
-                    if "result" in response and "tools" in response["result"]:
-                        self.available_tools = response["result"]["tools"]
-            
-            elif self.server_type == "websocket":
-                tools_request = {
-                    "jsonrpc": "2.0",
-                    "id": 2,
-                    "method": "tools/list"
-                }
-                
-                await self.connection.send(json.dumps(tools_request))
-                response = await self.connection.recv()
-                response_data = json.loads(response)
-                
-                if "result" in response_data and "tools" in response_data["result"]:
-                    self.available_tools = response_data["result"]["tools"]
-            
+            if self.server_type in ("stdio", "websocket"):
+                response = await self._rpc("tools/list", timeout=30)
+                if "result" in response and "tools" in response["result"]:
+                    self.available_tools = response["result"]["tools"]
+
             logger.info(f"Discovered {len(self.available_tools)} tools from {self.server_name}")
             
         except Exception as e:
             logger.error(f"Failed to discover standard tools: {e}")
     
-    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Call a tool with enhanced error handling and logging"""
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any], idempotent: bool = False) -> Dict[str, Any]:
+        """Call a tool with enhanced error handling and logging
+
+        When ``idempotent`` is True, concurrent identical calls over HTTP
+        transports are coalesced into a single request and share its result.
+        """
         try:
             logger.info(f"Calling tool {tool_name} on {self.server_name} with arguments: {arguments}")
-            
+
             # Validate and enhance arguments for common tools
             enhanced_arguments = self._enhance_tool_arguments(tool_name, arguments)
-            
+
             if self.server_type == "custom" and ("pipedream.net" in self.uri or "mcp.pipedream.net" in self.uri):
+                if idempotent:
+                    return await self._coalesced_call(self._call_pipedream_tool, tool_name, enhanced_arguments)
                 return await self._call_pipedream_tool(tool_name, enhanced_arguments)
             elif self.server_type == "stdio":
                 return await self._call_stdio_tool(tool_name, enhanced_arguments)
             elif self.server_type == "websocket":
                 return await self._call_websocket_tool(tool_name, enhanced_arguments)
             else:
+                if idempotent:
+                    return await self._coalesced_call(self._call_http_tool, tool_name, enhanced_arguments)
                 return await self._call_http_tool(tool_name, enhanced_arguments)
-                
+
         except Exception as e:
             logger.error(f"Failed to call tool {tool_name}: {e}")
             return {"error": f"Tool call failed: {str(e)}"}
+
+    async def _coalesced_call(self, call_method, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Coalesce concurrent identical tool calls into one in-flight request"""
+        try:
+            key = (tool_name, json.dumps(arguments, sort_keys=True, default=str))
+        except (TypeError, ValueError):
+            # Arguments are not hashable/serializable; skip coalescing
+            return await call_method(tool_name, arguments)
+
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+
+        future = asyncio.get_event_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await call_method(tool_name, arguments)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
     
     def _enhance_tool_arguments(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Enhance tool arguments with defaults and validation for common tools"""
@@ -1010,114 +1670,67 @@ class MCPClientDeepSeek:
         if tool_name in youtube_tools and 'instruction' not in enhanced:
             enhanced['instruction'] = "Search for videos or get video information"
         
-        logger.info(f"Enhanced arguments for {tool_name}: {enhanced}")
+        logger.info("Enhanced arguments for %s: %s", tool_name, enhanced)
         return enhanced
     
     async def _call_pipedream_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Call tool on Pipedream server with increased timeout"""
         try:
-            async with aiohttp.ClientSession() as session:
-                target_uri = self.uri
-                if self.session_endpoint:
-                    base_uri = self.uri.rstrip('/')
-                    if self.session_endpoint.startswith('/'):
-                        target_uri = base_uri + self.session_endpoint
-                    else:
-                        target_uri = base_uri + '/' + self.session_endpoint
-                    logger.info(f"Using Pipedream session endpoint: {target_uri}")
+            target_uri = self.uri
+            if self.session_endpoint:
+                base_uri = self.uri.rstrip('/')
+                if self.session_endpoint.startswith('/'):
+                    target_uri = base_uri + self.session_endpoint
+                else:
+                    target_uri = base_uri + '/' + self.session_endpoint
+                logger.info("Using Pipedream session endpoint: %s", target_uri)
 
-                pipedream_request = {
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "tools/call",
-                    "params": {
-                        "name": tool_name,
-                        "arguments": arguments
-                    }
+            pipedream_request = {
+                "jsonrpc": "2.0",
+                "id": next(self._next_id),
+                "method": "tools/call",
+                "params": {
+                    "name": tool_name,
+                    "arguments": arguments
                 }
-                
-                # Increased timeout configuration
-                timeout = aiohttp.ClientTimeout(
-                    connect=15.0,
-                    sock_read=self.pipedream_timeout,
-                    sock_connect=15.0
-                )
-                
-                logger.info(f"📡 [MCP DEBUG] 5. Making HTTP request to Pipedream:")
-                logger.info(f"   URL: {target_uri}")
-                logger.info(f"   Timeout: {self.pipedream_timeout} seconds")
-                
-                async with session.post(
-                    target_uri,
-                    json=pipedream_request,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Accept": "text/event-stream, application/json",
-                        "User-Agent": "ChatConnect-DeepSeek-MCP-Client/1.0"
-                    },
-                    timeout=timeout
-                ) as pipedream_response:
-                    logger.info(f"📥 [MCP DEBUG] 6. Received Pipedream response:")
-                    logger.info(f"   Status: {pipedream_response.status}")
-                    logger.info(f"   Headers: {dict(pipedream_response.headers)}")
-                    
-                    if pipedream_response.status == 200:
-                        content_type = pipedream_response.headers.get('content-type', '')
-                        if 'text/event-stream' in content_type:
-                            response_text = await pipedream_response.text()
-                            lines = response_text.strip().split('\n')
-                            for line in lines:
-                                if line.startswith('data: '):
-                                    data_json = line[6:]
-                                    try:
-                                        response_data = json.loads(data_json)
-                                        
-                                        # Check for Pipedream validation errors
-                                        if isinstance(response_data, dict) and "result" in response_data:
-                                            result = response_data["result"]
-                                            if isinstance(result, dict) and "content" in result:
-                                                content = result["content"]
-                                                if isinstance(content, list) and len(content) > 0:
-                                                    first_content = content[0]
-                                                    if isinstance(first_content, dict) and "text" in first_content:
-                                                        text = first_content["text"]
-                                                        if "Error parsing arguments" in text:
-                                                            # Extract the specific error details
-                                                            error_msg = "The tool requires specific parameters that weren't provided."
-                                                            suggestion = "Try rephrasing your request with more specific details."
-                                                            
-                                                            # Check if it's a missing instruction parameter
-                                                            if "instruction" in text and "Required" in text:
-                                                                error_msg = "The tool needs more specific instructions about what you want to do."
-                                                                suggestion = "Instead of 'list files', try 'list all files in my Google Drive' or 'show me the files in the root folder'."
-                                                            
-                                                            return {
-                                                                "error": error_msg,
-                                                                "error_type": "parameter_validation",
-                                                                "suggestion": suggestion,
-                                                                "technical_details": text,
-                                                                "enhanced_arguments": arguments
-                                                            }
-                                        
-                                        # OAuth handling logic
-                                        if isinstance(response_data, dict):
-                                            if "error" in response_data and "oauth" in response_data["error"].lower():
-                                                return {"error": "OAuth authentication required", "oauth_required": True, "message": "Please authenticate with Gmail first", "details": response_data.get("error", "")}
-                                            if "oauth_url" in response_data or "auth_url" in response_data:
-                                                return {"oauth_required": True, "oauth_url": response_data.get("oauth_url") or response_data.get("auth_url"), "message": "Please click the link to authenticate with Gmail"}
-                                            if "success" in response_data and response_data.get("success"):
-                                                return {"success": True, "message": response_data.get("message", "Operation completed successfully"), "data": response_data.get("data", {})}
-                                        
-                                        return response_data
-                                    except json.JSONDecodeError as e:
-                                        logger.error(f"Failed to parse Pipedream response JSON: {e}")
-                                        return {"error": "Invalid response format from Pipedream", "raw_response": data_json}
-                        else:
-                            # Handle regular JSON response
+            }
+
+            # Long read budget for slow workflows, but fail connects fast
+            timeout = httpx.Timeout(
+                connect=5.0,
+                read=self.pipedream_timeout,
+                write=self.pipedream_timeout,
+                pool=5.0
+            )
+
+            logger.info("📡 [MCP DEBUG] 5. Making HTTP request to Pipedream:")
+            logger.info("   URL: %s", target_uri)
+            logger.info("   Timeout: %s seconds", self.pipedream_timeout)
+
+            async with _get_pd_client().stream(
+                "POST",
+                target_uri,
+                content=_dumps(pipedream_request),
+                headers={
+                    "Content-Type": "application/json",
+                    "Accept": "text/event-stream, application/json",
+                    "User-Agent": "ChatConnect-DeepSeek-MCP-Client/1.0"
+                },
+                timeout=timeout
+            ) as pipedream_response:
+                logger.info("📥 [MCP DEBUG] 6. Received Pipedream response:")
+                logger.info("   Status: %s", pipedream_response.status_code)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("   Headers: %s", dict(pipedream_response.headers))
+
+                if pipedream_response.status_code == 200:
+                    content_type = pipedream_response.headers.get('content-type', '')
+                    if 'text/event-stream' in content_type:
+                        async for data_json in _iter_sse_data(pipedream_response.aiter_bytes()):
                             try:
-                                response_data = await pipedream_response.json()
-                                
-                                # Check for the same validation errors in JSON responses
+                                response_data = _loads(data_json)
+                                        
+                                # Check for Pipedream validation errors
                                 if isinstance(response_data, dict) and "result" in response_data:
                                     result = response_data["result"]
                                     if isinstance(result, dict) and "content" in result:
@@ -1127,13 +1740,15 @@ class MCPClientDeepSeek:
                                             if isinstance(first_content, dict) and "text" in first_content:
                                                 text = first_content["text"]
                                                 if "Error parsing arguments" in text:
+                                                    # Extract the specific error details
                                                     error_msg = "The tool requires specific parameters that weren't provided."
                                                     suggestion = "Try rephrasing your request with more specific details."
-                                                    
+                                                            
+                                                    # Check if it's a missing instruction parameter
                                                     if "instruction" in text and "Required" in text:
                                                         error_msg = "The tool needs more specific instructions about what you want to do."
                                                         suggestion = "Instead of 'list files', try 'list all files in my Google Drive' or 'show me the files in the root folder'."
-                                                    
+                                                            
                                                     return {
                                                         "error": error_msg,
                                                         "error_type": "parameter_validation",
@@ -1141,58 +1756,106 @@ class MCPClientDeepSeek:
                                                         "technical_details": text,
                                                         "enhanced_arguments": arguments
                                                     }
-                                
+                                        
+                                # OAuth handling logic
+                                if isinstance(response_data, dict):
+                                    if "error" in response_data and "oauth" in response_data["error"].lower():
+                                        return {"error": "OAuth authentication required", "oauth_required": True, "message": "Please authenticate with Gmail first", "details": response_data.get("error", "")}
+                                    if "oauth_url" in response_data or "auth_url" in response_data:
+                                        return {"oauth_required": True, "oauth_url": response_data.get("oauth_url") or response_data.get("auth_url"), "message": "Please click the link to authenticate with Gmail"}
+                                    if "success" in response_data and response_data.get("success"):
+                                        return {"success": True, "message": response_data.get("message", "Operation completed successfully"), "data": response_data.get("data", {})}
+                                        
                                 return response_data
                             except json.JSONDecodeError as e:
-                                logger.error(f"Failed to parse Pipedream JSON response: {e}")
-                                return {"error": "Invalid JSON response from Pipedream"}
+                                logger.error("Failed to parse Pipedream response JSON: %s", e)
+                                return {"error": "Invalid response format from Pipedream", "raw_response": data_json.decode('utf-8', 'ignore')}
                     else:
-                        return {"error": f"HTTP {pipedream_response.status}: {await pipedream_response.text()}"}
-                        
-        except asyncio.TimeoutError:
-            logger.error(f"⏰ [MCP DEBUG] 7. Pipedream request timed out after {self.pipedream_timeout} seconds")
+                        # Handle regular JSON response
+                        try:
+                            response_data = _loads(await pipedream_response.aread())
+                                
+                            # Check for the same validation errors in JSON responses
+                            if isinstance(response_data, dict) and "result" in response_data:
+                                result = response_data["result"]
+                                if isinstance(result, dict) and "content" in result:
+                                    content = result["content"]
+                                    if isinstance(content, list) and len(content) > 0:
+                                        first_content = content[0]
+                                        if isinstance(first_content, dict) and "text" in first_content:
+                                            text = first_content["text"]
+                                            if "Error parsing arguments" in text:
+                                                error_msg = "The tool requires specific parameters that weren't provided."
+                                                suggestion = "Try rephrasing your request with more specific details."
+                                                    
+                                                if "instruction" in text and "Required" in text:
+                                                    error_msg = "The tool needs more specific instructions about what you want to do."
+                                                    suggestion = "Instead of 'list files', try 'list all files in my Google Drive' or 'show me the files in the root folder'."
+                                                    
+                                                return {
+                                                    "error": error_msg,
+                                                    "error_type": "parameter_validation",
+                                                    "suggestion": suggestion,
+                                                    "technical_details": text,
+                                                    "enhanced_arguments": arguments
+                                                }
+                                
+                            return response_data
+                        except json.JSONDecodeError as e:
+                            logger.error("Failed to parse Pipedream JSON response: %s", e)
+                            return {"error": "Invalid JSON response from Pipedream"}
+                else:
+                    # Same cap as the HTTP path: keep error bodies bounded
+                    body = bytearray()
+                    async for chunk in pipedream_response.aiter_bytes():
+                        body += chunk
+                        if len(body) >= 4096:
+                            break
+                    return {"error": f"HTTP {pipedream_response.status_code}: {bytes(body[:4096]).decode('utf-8', 'replace')}"}
+
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            logger.error("⏰ [MCP DEBUG] 7. Pipedream request timed out after %s seconds", self.pipedream_timeout)
             return {
                 "error": f"Pipedream workflow is taking too long (timeout after {self.pipedream_timeout}s). Please check your workflow configuration.",
                 "suggestion": "Try simplifying your Pipedream workflow or check for infinite loops.",
                 "timeout_seconds": self.pipedream_timeout
             }
         except Exception as e:
-            logger.error(f"Pipedream tool call failed: {e}")
+            logger.error("Pipedream tool call failed: %s", e)
             return {"error": f"Pipedream tool call failed: {str(e)}"}
     
     async def _call_stdio_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Call tool on stdio-based server"""
         try:
-            tool_request = {
-                "jsonrpc": "2.0",
-                "id": 3,
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
-                }
-            }
-            
-            tool_message = json.dumps(tool_request) + "\n"
-            self.connection.stdin.write(tool_message.encode())
-            await self.connection.stdin.drain()
-            
-            response_line = await self.connection.stdout.readline()
-            if response_line:
-                response = json.loads(response_line.decode().strip())
-                if "result" in response:
-                    return response["result"]
-                elif "error" in response:
-                    return {"error": response["error"]}
-            
+            response = await self._rpc_tools_call(tool_name, arguments)
+            if "result" in response:
+                return response["result"]
+            elif "error" in response:
+                return {"error": response["error"]}
+
             return {"error": "No response from stdio server"}
-            
+
         except Exception as e:
             return {"error": f"Stdio tool call failed: {str(e)}"}
-    
+
     async def _call_websocket_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Call tool on WebSocket-based server"""
         try:
+            response = await self._rpc_tools_call(tool_name, arguments)
+            if "result" in response:
+                return response["result"]
+            elif "error" in response:
+                return {"error": response["error"]}
+
+            return {"error": "No response from WebSocket server"}
+
+        except Exception as e:
+            return {"error": f"WebSocket tool call failed: {str(e)}"}
+    
+    async def _call_http_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Call tool on HTTP-based server"""
+        try:
+            session = await self._session()
             tool_request = {
                 "jsonrpc": "2.0",
                 "id": 3,
@@ -1202,68 +1865,78 @@ class MCPClientDeepSeek:
                     "arguments": arguments
                 }
             }
-            
-            await self.connection.send(json.dumps(tool_request))
-            response = await self.connection.recv()
-            response_data = json.loads(response)
-            
-            if "result" in response_data:
-                return response_data["result"]
-            elif "error" in response_data:
-                return {"error": response_data["error"]}
-            
-            return {"error": "No response from WebSocket server"}
-            
-        except Exception as e:
-            return {"error": f"WebSocket tool call failed: {str(e)}"}
-    
-    async def _call_http_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Call tool on HTTP-based server"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                tool_request = {
-                    "jsonrpc": "2.0",
-                    "id": 3,
-                    "method": "tools/call",
-                    "params": {
-                        "name": tool_name,
-                        "arguments": arguments
-                    }
-                }
                 
-                async with session.post(
-                    self.uri,
-                    json=tool_request,
-                    headers={"Content-Type": "application/json"},
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    if response.status == 200:
-                        response_data = await response.json()
-                        if "result" in response_data:
-                            return response_data["result"]
-                        elif "error" in response_data:
-                            return {"error": response_data["error"]}
-                    else:
-                        return {"error": f"HTTP {response.status}: {await response.text()}"}
+            async with session.post(
+                self.uri,
+                data=_dumps(tool_request),
+                headers={"Content-Type": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=None, connect=5, sock_connect=5, sock_read=15)
+            ) as response:
+                if response.status == 200:
+                    if ijson is not None and tool_name in self.large_result_tools:
+                        return await self._stream_json_response(response)
+                    response_data = await response.json(loads=_loads)
+                    if "result" in response_data:
+                        return response_data["result"]
+                    elif "error" in response_data:
+                        return {"error": response_data["error"]}
+                else:
+                    # Read only a prefix of the error body; a misbehaving
+                    # upstream should not be able to blow up memory or logs
+                    snippet = (await response.content.read(4096)).decode('utf-8', errors='replace')
+                    return {"error": f"HTTP {response.status}: {snippet}"}
             
             return {"error": "No response from HTTP server"}
-            
+
         except Exception as e:
             return {"error": f"HTTP tool call failed: {str(e)}"}
+
+    async def _stream_json_response(self, response) -> Dict[str, Any]:
+        """Incrementally parse a large JSON-RPC body without buffering it whole
+
+        Feeds 64 KiB chunks into an ijson coroutine so the raw bytes and the
+        parsed result are never held in memory at the same time.
+        """
+        matches = []
+
+        def _collector(out):
+            while True:
+                out.append((yield))
+
+        sink = _collector(matches)
+        next(sink)  # prime the generator
+        parser = ijson.items_coro(sink, "result")
+        try:
+            async for chunk in response.content.iter_chunked(65536):
+                parser.send(chunk)
+            parser.close()
+        except ijson.JSONError as e:
+            return {"error": f"Invalid JSON response from HTTP server: {e}"}
+
+        if matches:
+            return matches[0]
+        return {"error": "No result in response from HTTP server"}
     
+    async def _close_stdio(self) -> None:
+        """Terminate the stdio child process and reap it"""
+        if self.connection:
+            self.connection.terminate()
+            await self.connection.wait()
+
+    async def _close_websocket(self) -> None:
+        """Close the websocket (the rpc pump is stopped before this runs)"""
+        if self.connection:
+            await self.connection.close()
+
     async def disconnect(self) -> None:
-        """Disconnect from the server"""
+        """Disconnect from the server by unwinding the connect-time stack"""
         try:
-            if self.connection:
-                if self.server_type == "stdio":
-                    self.connection.terminate()
-                    await self.connection.wait()
-                elif self.server_type == "websocket":
-                    await self.connection.close()
-            
-            self.is_connected = False
+            await self._stack.aclose()
+            self._stack = contextlib.AsyncExitStack()
+            self.connection = None
+            self.state = self._STATE_DISCONNECTED
             logger.info(f"Disconnected from MCP server: {self.server_name}")
-            
+
         except Exception as e:
             logger.error(f"Error disconnecting from {self.server_name}: {e}")
 
@@ -1,15 +1,71 @@
+import asyncio
 import os
+import re
 import secrets
 import json
 import aiohttp
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
-from urllib.parse import urlencode, parse_qs, urlparse
+from urllib.parse import urlencode, quote_plus, parse_qs, urlparse
 from prisma import Prisma
 import logging
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Provider detection is pure string matching on a small set of URLs, so
+# compile the patterns once and memoize results per URL
+_GMAIL_RE = re.compile(r"gmail", re.IGNORECASE)
+_GOOGLE_RE = re.compile(r"google", re.IGNORECASE)
+
+@lru_cache(maxsize=1024)
+def _detect_provider(url: str) -> Optional[str]:
+    """Detect the OAuth provider for an MCP server URL"""
+    if "pipedream.net" not in url:
+        return None
+    if _GMAIL_RE.search(url):
+        return "gmail"
+    if _GOOGLE_RE.search(url):
+        return "google"
+    # Add more providers as needed
+    return None
+
+# One shared session for all OAuth token traffic so consecutive exchanges
+# and refreshes against the same provider reuse the pooled TLS connection
+# instead of re-handshaking per call
+_session: Optional[aiohttp.ClientSession] = None
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Lazily create the module-wide aiohttp session"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+            ),
+            # Bound each phase instead of the whole request: a stalled
+            # handshake or silent peer fails fast without capping healthy
+            # but slow transfers
+            timeout=aiohttp.ClientTimeout(total=None, connect=5, sock_connect=5, sock_read=15),
+        )
+    return _session
+
+async def close_session() -> None:
+    """Close the shared session (call on application shutdown)"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
 class OAuthService:
     def __init__(self):
         self.prisma = Prisma()
@@ -31,14 +87,100 @@ class OAuthService:
                 "redirect_uri": os.getenv("OAUTH_REDIRECT_URI", "http://localhost:3000/oauth/callback")
             }
         }
-    
+        # Only state and scope vary per request; encode the static query
+        # portion for each provider once instead of per generate_oauth_url
+        self._auth_url_prefix = {
+            provider: f"{cfg['auth_url']}?" + urlencode({
+                "client_id": cfg["client_id"] or "",
+                "redirect_uri": cfg["redirect_uri"],
+                "response_type": "code",
+                "access_type": "offline",  # Get refresh token
+                "prompt": "consent"  # Always show consent screen
+            })
+            for provider, cfg in self.oauth_configs.items()
+        }
+        # In-process TTL cache for validated OAuth states. States are
+        # short-lived (10 min) and single-use, so a hit here removes the
+        # Prisma round-trip from the callback hot path. Keyed by the state
+        # string, with an id -> state map so cleanup can invalidate.
+        self._state_cache: Dict[str, tuple] = {}
+        self._state_cache_by_id: Dict[str, str] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    _STATE_CACHE_MAX = 4096
+
+    def _cache_state(self, state: str, result: Dict[str, Any], expires_at: datetime) -> None:
+        """Remember a validated state until its DB record expires"""
+        if len(self._state_cache) >= self._STATE_CACHE_MAX:
+            self._purge_state_cache()
+        self._state_cache[state] = (expires_at, result)
+        self._state_cache_by_id[result["id"]] = state
+
+    def _purge_state_cache(self) -> None:
+        """Drop expired entries; states only live ten minutes anyway"""
+        now = datetime.utcnow()
+        for state, (expires_at, result) in list(self._state_cache.items()):
+            if expires_at < now:
+                self._state_cache.pop(state, None)
+                self._state_cache_by_id.pop(result["id"], None)
+
+    def _evict_state(self, state_id: str) -> None:
+        """Invalidate a consumed state by its record id"""
+        state = self._state_cache_by_id.pop(state_id, None)
+        if state is not None:
+            self._state_cache.pop(state, None)
+
     async def connect(self):
         """Connect to the database"""
         await self.prisma.connect()
-    
+
     async def disconnect(self):
         """Disconnect from the database"""
         await self.prisma.disconnect()
+
+    def start_cleanup_task(self) -> None:
+        """Start the background state reaper (call from app startup)
+
+        connect()/disconnect() are per-request, so the reaper has to be
+        owned by the application lifespan or it gets cancelled before
+        its first tick ever fires.
+        """
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.create_task(self._cleanup_expired_states())
+
+    async def stop_cleanup_task(self) -> None:
+        """Cancel the background state reaper (call from app shutdown)"""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
+
+    async def _cleanup_expired_states(self):
+        """Periodically bulk-delete expired OAuth states.
+
+        Keeps the validation path to a single query: expired rows are
+        filtered out by the where clause there and reaped here instead of
+        with an inline DELETE per failed validation. Runs once right away
+        so a backlog of abandoned states is cleared on startup.
+        """
+        while True:
+            try:
+                # Per-request callers disconnect the shared client, so
+                # make sure it is usable before each sweep
+                if not self.prisma.is_connected():
+                    await self.prisma.connect()
+                await self.prisma.oauthstate.delete_many(
+                    where={"expiresAt": {"lt": datetime.utcnow()}}
+                )
+                self._purge_state_cache()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"OAuth state cleanup failed: {e}")
+            await asyncio.sleep(60)
     
     def generate_oauth_state(self) -> str:
         """Generate a secure OAuth state parameter"""
@@ -64,34 +206,45 @@ class OAuthService:
     
     async def validate_oauth_state(self, state: str) -> Optional[Dict[str, Any]]:
         """Validate and retrieve OAuth state"""
-        oauth_state = await self.prisma.oauthstate.find_unique(
-            where={"state": state},
+        cached = self._state_cache.get(state)
+        if cached is not None:
+            expires_at, result = cached
+            if expires_at >= datetime.utcnow():
+                return result
+            self._evict_state(result["id"])
+
+        # Prisma Client Python has no `select` projection, so the next best
+        # narrowing is to stop joining relations the callers never read: only
+        # the server (for its name) is needed, the full user row is not.
+        # Expiry is part of the where clause, so an expired state costs one
+        # round-trip; the background cleanup loop reaps the dead rows.
+        oauth_state = await self.prisma.oauthstate.find_first(
+            where={
+                "state": state,
+                "expiresAt": {"gt": datetime.utcnow()}
+            },
             include={
-                "user": True,
                 "server": True
             }
         )
-        
+
         if not oauth_state:
             return None
-        
-        if oauth_state.expiresAt < datetime.utcnow():
-            # Clean up expired state
-            await self.prisma.oauthstate.delete(where={"id": oauth_state.id})
-            return None
-        
-        return {
+
+        result = {
             "id": oauth_state.id,
             "userId": oauth_state.userId,
             "serverId": oauth_state.serverId,
             "provider": oauth_state.provider,
             "redirectUri": oauth_state.redirectUri,
-            "user": oauth_state.user,
             "server": oauth_state.server
         }
-    
+        self._cache_state(state, result, oauth_state.expiresAt)
+        return result
+
     async def cleanup_oauth_state(self, state_id: str):
         """Clean up OAuth state after use"""
+        self._evict_state(state_id)
         try:
             await self.prisma.oauthstate.delete(where={"id": state_id})
         except Exception as e:
@@ -108,19 +261,10 @@ class OAuthService:
         scope = config["scope"]
         if additional_scopes:
             scope = f"{scope} {additional_scopes}"
-        
-        params = {
-            "client_id": config["client_id"],
-            "redirect_uri": config["redirect_uri"],
-            "response_type": "code",
-            "scope": scope,
-            "state": state,
-            "access_type": "offline",  # Get refresh token
-            "prompt": "consent"  # Always show consent screen
-        }
-        
-        auth_url = f"{config['auth_url']}?{urlencode(params)}"
-        return auth_url
+
+        # quote_plus matches what urlencode produced for these values before
+        prefix = self._auth_url_prefix[provider]
+        return f"{prefix}&scope={quote_plus(scope)}&state={quote_plus(state)}"
     
     async def exchange_code_for_tokens(self, provider: str, code: str) -> Optional[Dict[str, Any]]:
         """Exchange authorization code for access and refresh tokens"""
@@ -138,31 +282,32 @@ class OAuthService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    config["token_url"],
-                    data=token_data,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"}
-                ) as response:
-                    if response.status == 200:
-                        token_response = await response.json()
-                        
-                        # Calculate expiry time
-                        expires_at = None
-                        if "expires_in" in token_response:
-                            expires_at = datetime.utcnow() + timedelta(seconds=token_response["expires_in"])
-                        
-                        return {
-                            "access_token": token_response.get("access_token"),
-                            "refresh_token": token_response.get("refresh_token"),
-                            "token_type": token_response.get("token_type", "Bearer"),
-                            "expires_at": expires_at,
-                            "scope": token_response.get("scope")
-                        }
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Token exchange failed: {response.status} - {error_text}")
-                        return None
+            session = await _get_session()
+            async with session.post(
+                config["token_url"],
+                data=token_data,
+                headers={"Content-Type": "application/x-www-form-urlencoded"}
+            ) as response:
+                if response.status == 200:
+                    token_response = await response.json(loads=_loads)
+
+                    # Calculate expiry time
+                    expires_at = None
+                    if "expires_in" in token_response:
+                        expires_at = datetime.utcnow() + timedelta(seconds=token_response["expires_in"])
+
+                    return {
+                        "access_token": token_response.get("access_token"),
+                        "refresh_token": token_response.get("refresh_token"),
+                        "token_type": token_response.get("token_type", "Bearer"),
+                        "expires_at": expires_at,
+                        "scope": token_response.get("scope")
+                    }
+                else:
+                    # Cap the error body read; only a snippet is logged anyway
+                    error_text = (await response.content.read(4096)).decode('utf-8', errors='replace')
+                    logger.error(f"Token exchange failed: {response.status} - {error_text}")
+                    return None
         except Exception as e:
             logger.error(f"Token exchange error: {e}")
             return None
@@ -203,6 +348,53 @@ class OAuthService:
             logger.error(f"Failed to store OAuth tokens: {e}")
             raise
     
+    async def store_many_oauth_tokens(self, entries: List[Dict[str, Any]]):
+        """Store several token sets in one batched round-trip
+
+        Each entry is ``{"user_id", "server_id", "provider", "tokens"}``
+        with the same tokens shape store_oauth_tokens takes. The upserts
+        are queued on a Prisma batcher and committed together, so a login
+        that refreshes several providers costs one round-trip instead of
+        one per token.
+        """
+        if not entries:
+            return
+        try:
+            async with self.prisma.batch_() as batcher:
+                for entry in entries:
+                    tokens = entry["tokens"]
+                    batcher.oauthtoken.upsert(
+                        where={
+                            "userId_serverId_provider": {
+                                "userId": entry["user_id"],
+                                "serverId": entry["server_id"],
+                                "provider": entry["provider"]
+                            }
+                        },
+                        update={
+                            "accessToken": tokens["access_token"],
+                            "refreshToken": tokens.get("refresh_token"),
+                            "tokenType": tokens.get("token_type", "Bearer"),
+                            "expiresAt": tokens.get("expires_at"),
+                            "scope": tokens.get("scope"),
+                            "updatedAt": datetime.utcnow()
+                        },
+                        create={
+                            "userId": entry["user_id"],
+                            "serverId": entry["server_id"],
+                            "provider": entry["provider"],
+                            "accessToken": tokens["access_token"],
+                            "refreshToken": tokens.get("refresh_token"),
+                            "tokenType": tokens.get("token_type", "Bearer"),
+                            "expiresAt": tokens.get("expires_at"),
+                            "scope": tokens.get("scope")
+                        }
+                    )
+            logger.info(f"Stored OAuth tokens for {len(entries)} provider(s) in one batch")
+        except Exception as e:
+            logger.error(f"Failed to batch-store OAuth tokens: {e}")
+            raise
+
     async def get_oauth_tokens(self, user_id: int, server_id: int, provider: str) -> Optional[Dict[str, Any]]:
         """Retrieve OAuth tokens for a user/server/provider combination"""
         try:
@@ -246,8 +438,14 @@ class OAuthService:
             logger.error(f"Failed to get OAuth tokens: {e}")
             return None
     
-    async def refresh_oauth_tokens(self, user_id: int, server_id: int, provider: str, refresh_token: str) -> Optional[Dict[str, Any]]:
-        """Refresh OAuth tokens using refresh token"""
+    async def refresh_oauth_tokens(self, user_id: int, server_id: int, provider: str, refresh_token: str,
+                                   store: bool = True) -> Optional[Dict[str, Any]]:
+        """Refresh OAuth tokens using refresh token
+
+        With ``store=False`` the refreshed tokens are returned without
+        being persisted, so callers refreshing in bulk can batch the
+        upserts themselves.
+        """
         config = self.oauth_configs.get(provider)
         if not config:
             logger.error(f"OAuth provider '{provider}' not configured")
@@ -261,39 +459,85 @@ class OAuthService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    config["token_url"],
-                    data=token_data,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"}
-                ) as response:
-                    if response.status == 200:
-                        token_response = await response.json()
-                        
-                        # Calculate expiry time
-                        expires_at = None
-                        if "expires_in" in token_response:
-                            expires_at = datetime.utcnow() + timedelta(seconds=token_response["expires_in"])
-                        
-                        tokens = {
-                            "access_token": token_response.get("access_token"),
-                            "refresh_token": refresh_token,  # Keep the same refresh token
-                            "token_type": token_response.get("token_type", "Bearer"),
-                            "expires_at": expires_at,
-                            "scope": token_response.get("scope")
-                        }
-                        
-                        # Update stored tokens
+            session = await _get_session()
+            async with session.post(
+                config["token_url"],
+                data=token_data,
+                headers={"Content-Type": "application/x-www-form-urlencoded"}
+            ) as response:
+                if response.status == 200:
+                    token_response = await response.json(loads=_loads)
+
+                    # Calculate expiry time
+                    expires_at = None
+                    if "expires_in" in token_response:
+                        expires_at = datetime.utcnow() + timedelta(seconds=token_response["expires_in"])
+
+                    tokens = {
+                        "access_token": token_response.get("access_token"),
+                        "refresh_token": refresh_token,  # Keep the same refresh token
+                        "token_type": token_response.get("token_type", "Bearer"),
+                        "expires_at": expires_at,
+                        "scope": token_response.get("scope")
+                    }
+
+                    # Update stored tokens
+                    if store:
                         await self.store_oauth_tokens(user_id, server_id, provider, tokens)
-                        return tokens
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Token refresh failed: {response.status} - {error_text}")
-                        return None
+                    return tokens
+                else:
+                    error_text = (await response.content.read(4096)).decode('utf-8', errors='replace')
+                    logger.error(f"Token refresh failed: {response.status} - {error_text}")
+                    return None
         except Exception as e:
             logger.error(f"Token refresh error: {e}")
             return None
     
+    async def refresh_all_if_needed(self, user_id: int) -> int:
+        """Refresh every expired token for a user concurrently
+
+        The refresh POSTs run through asyncio.gather on the shared session,
+        so a user with several expired tokens pays roughly one round-trip
+        to the provider instead of one per token. Returns the number of
+        tokens successfully refreshed.
+        """
+        try:
+            tokens = await self.prisma.oauthtoken.find_many(where={"userId": user_id})
+        except Exception as e:
+            logger.error(f"Failed to load tokens for refresh: {e}")
+            return 0
+
+        now = datetime.utcnow()
+        expired = [
+            t for t in tokens
+            if t.refreshToken and t.expiresAt and t.expiresAt < now
+        ]
+        if not expired:
+            return 0
+
+        results = await asyncio.gather(
+            *[
+                self.refresh_oauth_tokens(t.userId, t.serverId, t.provider, t.refreshToken, store=False)
+                for t in expired
+            ],
+            return_exceptions=True
+        )
+        # Persist all successful refreshes in one batched round-trip
+        entries = [
+            {"user_id": t.userId, "server_id": t.serverId, "provider": t.provider, "tokens": r}
+            for t, r in zip(expired, results)
+            if isinstance(r, dict)
+        ]
+        try:
+            await self.store_many_oauth_tokens(entries)
+        except Exception:
+            # Already logged; the tokens are still valid in memory
+            pass
+        refreshed = len(entries)
+        if refreshed < len(expired):
+            logger.warning(f"Refreshed {refreshed}/{len(expired)} expired tokens for user {user_id}")
+        return refreshed
+
     async def delete_oauth_tokens(self, user_id: int, server_id: int, provider: str):
         """Delete OAuth tokens for a user/server/provider combination"""
         try:
@@ -312,21 +556,29 @@ class OAuthService:
         """Get OAuth status for all servers for a user"""
         try:
             tokens = await self.prisma.oauthtoken.find_many(
-                where={"userId": user_id},
-                include={
-                    "server": True
-                }
+                where={"userId": user_id}
             )
-            
+
+            # Only the server name is displayed, so instead of joining the
+            # full server row onto every token, fetch each referenced server
+            # once and map id -> name.
+            server_ids = list({token.serverId for token in tokens})
+            server_names: Dict[int, str] = {}
+            if server_ids:
+                servers = await self.prisma.mcpserver.find_many(
+                    where={"id": {"in": server_ids}}
+                )
+                server_names = {server.id: server.name for server in servers}
+
             status_list = []
             for token in tokens:
                 is_valid = True
                 if token.expiresAt and token.expiresAt < datetime.utcnow():
                     is_valid = False
-                
+
                 status_list.append({
                     "server_id": token.serverId,
-                    "server_name": token.server.name,
+                    "server_name": server_names.get(token.serverId),
                     "provider": token.provider,
                     "is_valid": is_valid,
                     "expires_at": token.expiresAt,
@@ -340,13 +592,7 @@ class OAuthService:
     
     def detect_oauth_provider_from_url(self, url: str) -> Optional[str]:
         """Detect OAuth provider from MCP server URL"""
-        if "pipedream.net" in url:
-            if "gmail" in url.lower():
-                return "gmail"
-            elif "google" in url.lower():
-                return "google"
-            # Add more providers as needed
-        return None
+        return _detect_provider(url)
 
 # Global OAuth service instance
 oauth_service = OAuthService() 
\ No newline at end of file
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Shared Prisma client for the diagnostic scripts
+
+Each script used to build its own Prisma() and pay a fresh connect and
+disconnect per run. shared_prisma() hands out one lazily-connected client
+and reference-counts callers, so nested or back-to-back uses in the same
+process reuse a single connection and it closes when the last user exits.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from prisma import Prisma
+
+_client: Optional[Prisma] = None
+_refs = 0
+_lock = asyncio.Lock()
+
+@asynccontextmanager
+async def shared_prisma():
+    """Yield the shared connected Prisma client"""
+    global _client, _refs
+    async with _lock:
+        if _client is None:
+            _client = Prisma()
+        if _refs == 0 and not _client.is_connected():
+            await _client.connect()
+        _refs += 1
+    try:
+        yield _client
+    finally:
+        async with _lock:
+            _refs -= 1
+            if _refs == 0 and _client.is_connected():
+                await _client.disconnect()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Buffered stdout for the diagnostic scripts
+
+print() acquires the stdout lock and, on a TTY, flushes once per line —
+hundreds of syscalls per run for scripts that only emit a report. p()
+buffers lines instead and flush() writes the batch with one syscall.
+"""
+
+import sys
+
+from typing import List
+
+_lines: List[str] = []
+
+def p(*args) -> None:
+    """Buffer one output line, print-style"""
+    _lines.append(" ".join(str(a) for a in args))
+
+def flush() -> None:
+    """Write everything buffered so far in a single stdout write"""
+    if _lines:
+        sys.stdout.write("\n".join(_lines) + "\n")
+        sys.stdout.flush()
+        _lines.clear()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Shared chat-seeding logic for the recreate scripts
+
+Both recreate_chats_only.py and recreate_test_data.py reseed the same
+three sample conversations; the wipe-and-insert sequence lives here so
+the transaction and create_many behaviour stays identical for both.
+"""
+
+from secrets import token_hex
+
+from _out import p
+
+# Seed conversations; built once at import
+SAMPLE_CHATS = [
+    ("Math Help", [
+        ("user", "What is 15 + 27?"),
+        ("assistant", "15 + 27 = 42."),
+        ("user", "And multiplied by 2?"),
+        ("assistant", "42 × 2 = 84."),
+    ]),
+    ("Weather Check", [
+        ("user", "What's the weather in Tokyo?"),
+        ("assistant", "It's currently 22°C and sunny in Tokyo."),
+    ]),
+    ("File Test", [
+        ("user", "Create a file called test.txt with 'Hello World'"),
+        ("assistant", "I've created test.txt with the content 'Hello World'."),
+    ]),
+]
+
+async def seed_chats(prisma, user_id: int) -> list:
+    """Replace the user's chats with the sample conversations
+
+    Runs inside one transaction — a single BEGIN/COMMIT instead of an
+    autocommit per statement, and the wipe rolls back if any later
+    insert fails. Returns the created ChatSession rows.
+    """
+    old_chats = await prisma.chatsession.find_many(where={"userId": user_id})
+    chat_ids = [chat.id for chat in old_chats]
+
+    async with prisma.tx() as tx:
+        if chat_ids:
+            await tx.message.delete_many(where={"chatSessionId": {"in": chat_ids}})
+            await tx.chatsession.delete_many(where={"id": {"in": chat_ids}})
+            p(f"🗑️  Removed {len(chat_ids)} old chat(s)")
+
+        # Sessions are created individually because we need their ids,
+        # but every message across all chats lands in one INSERT
+        created_chats = []
+        message_rows = []
+        for title, messages in SAMPLE_CHATS:
+            chat = await tx.chatsession.create(
+                data={"userId": user_id, "title": title, "hash": token_hex(16)}
+            )
+            p(f"💬 Created chat '{title}' (ID: {chat.id})")
+            created_chats.append(chat)
+            for role, content in messages:
+                message_rows.append({
+                    "chatSessionId": chat.id,
+                    "content": content,
+                    "role": role,
+                })
+
+        created = await tx.message.create_many(data=message_rows)
+    p(f"✅ Created {created} message(s) across {len(SAMPLE_CHATS)} chat(s)")
+    return created_chats
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Script to register the simple test MCP servers for a user
+
+Adds the local simple_mcp_servers endpoints (calculator, weather, files,
+combined) as MCPServer rows so the host can be exercised without Gmail or
+Pipedream. Also supports listing and deleting the test servers.
+"""
+
+import asyncio
+import sys
+
+from _db import shared_prisma
+from _out import p, flush
+
+TEST_MCP_SERVERS = [
+    {
+        "name": "Test Calculator",
+        "description": "Local calculator MCP server for testing",
+        "config": {"type": "custom", "uri": "http://localhost:8001/calculator"}
+    },
+    {
+        "name": "Test Weather",
+        "description": "Local weather simulator MCP server for testing",
+        "config": {"type": "custom", "uri": "http://localhost:8001/weather"}
+    },
+    {
+        "name": "Test Files",
+        "description": "Local file operations MCP server for testing",
+        "config": {"type": "custom", "uri": "http://localhost:8001/files"}
+    },
+    {
+        "name": "Test Combined",
+        "description": "Combined endpoint for all local test servers",
+        "config": {"type": "custom", "uri": "http://localhost:8001/mcp"}
+    }
+]
+
+async def add_test_mcp_servers(user_email: str):
+    """Add the test MCP servers for the given user"""
+    p("🔧 Adding Test MCP Servers...")
+    p("=" * 40)
+
+    try:
+        async with shared_prisma() as prisma:
+            # One round-trip: the user row and their servers come back together
+            user = await prisma.user.find_unique(
+                where={"email": user_email},
+                include={"servers": True}
+            )
+            if not user:
+                p(f"❌ User {user_email} not found")
+                return
+
+            # Set, not list: membership checks below stay O(1) as the server
+            # count grows
+            existing_names = {server.name for server in user.servers}
+
+            # One INSERT with multiple VALUES rows instead of a round-trip
+            # per server
+            data = [
+                {
+                    "userId": user.id,
+                    "name": server_config["name"],
+                    "description": server_config["description"],
+                    "config": server_config["config"]
+                }
+                for server_config in TEST_MCP_SERVERS
+                if server_config["name"] not in existing_names
+            ]
+
+            skipped = len(TEST_MCP_SERVERS) - len(data)
+            if skipped:
+                p(f"⏭️  Skipping {skipped} server(s) that already exist")
+
+            if data:
+                created = await prisma.mcpserver.create_many(data=data, skip_duplicates=True)
+                p(f"✅ Created {created} test MCP server(s)")
+            else:
+                p("✅ All test MCP servers already present")
+
+    except Exception as e:
+        p(f"❌ Error adding test MCP servers: {e}")
+    finally:
+        flush()
+
+async def list_mcp_servers(user_email: str):
+    """List all MCP servers for the given user"""
+    p("🔍 Listing MCP Servers...")
+    p("=" * 40)
+
+    try:
+        async with shared_prisma() as prisma:
+            user = await prisma.user.find_unique(
+                where={"email": user_email},
+                include={"servers": True}
+            )
+            if not user:
+                p(f"❌ User {user_email} not found")
+                return
+
+            servers = user.servers
+            p(f"🔧 MCP Servers for {user_email}: {len(servers)}")
+            for server in servers:
+                p(f"   - {server.name}: {server.description}")
+                p(f"     config: {server.config}")
+
+    except Exception as e:
+        p(f"❌ Error listing MCP servers: {e}")
+    finally:
+        flush()
+
+async def delete_test_mcp_servers(user_email: str):
+    """Delete the test MCP servers for the given user"""
+    p("🗑️  Deleting Test MCP Servers...")
+    p("=" * 40)
+
+    try:
+        async with shared_prisma() as prisma:
+            user = await prisma.user.find_unique(where={"email": user_email})
+            if not user:
+                p(f"❌ User {user_email} not found")
+                return
+
+            test_names = [server_config["name"] for server_config in TEST_MCP_SERVERS]
+            deleted = await prisma.mcpserver.delete_many(
+                where={"userId": user.id, "name": {"in": test_names}}
+            )
+            p(f"✅ Deleted {deleted} test MCP server(s)")
+
+    except Exception as e:
+        p(f"❌ Error deleting test MCP servers: {e}")
+    finally:
+        flush()
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python add_test_mcp_servers.py <user_email> [add|list|delete]")
+        sys.exit(1)
+
+    user_email = sys.argv[1]
+    action = sys.argv[2] if len(sys.argv) > 2 else "add"
+
+    if action == "add":
+        asyncio.run(add_test_mcp_servers(user_email))
+    elif action == "list":
+        asyncio.run(list_mcp_servers(user_email))
+    elif action == "delete":
+        asyncio.run(delete_test_mcp_servers(user_email))
+    else:
+        print(f"❌ Unknown action: {action}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
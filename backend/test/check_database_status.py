@@ -4,61 +4,62 @@ Script to check database status after reset
 """
 
 import asyncio
-from prisma import Prisma
+
+from _db import shared_prisma
+from _out import p, flush
 
 async def check_database():
     """Check what data exists in the database"""
-    print("🔍 Checking Database Status...")
-    print("=" * 40)
-    
-    prisma = Prisma()
-    await prisma.connect()
-    
+    p("🔍 Checking Database Status...")
+    p("=" * 40)
+
     try:
-        # Check users
-        users = await prisma.user.find_many()
-        print(f"👥 Users: {len(users)}")
-        for user in users:
-            print(f"   - {user.email} (ID: {user.id})")
-        
-        # Check chat sessions
-        chats = await prisma.chatsession.find_many()
-        print(f"💬 Chat Sessions: {len(chats)}")
-        for chat in chats:
-            print(f"   - Chat {chat.id}: {chat.title} (Hash: {chat.hash})")
-        
-        # Check MCP servers
-        servers = await prisma.mcpserver.find_many()
-        print(f"🔧 MCP Servers: {len(servers)}")
-        for server in servers:
-            print(f"   - {server.name}: {server.description}")
-        
-        # Check messages
-        messages = await prisma.message.find_many()
-        print(f"💭 Messages: {len(messages)}")
-        
-        # Check API keys
-        api_keys = await prisma.apikey.find_many()
-        print(f"🔑 API Keys: {len(api_keys)}")
-        
-        # Check OAuth tokens
-        oauth_tokens = await prisma.oauthtoken.find_many()
-        print(f"🔐 OAuth Tokens: {len(oauth_tokens)}")
-        
-        print("\n" + "=" * 40)
-        
-        if len(users) == 0:
-            print("❌ DATABASE IS EMPTY - All data was lost!")
-            print("💡 You'll need to recreate your account and data")
-        elif len(chats) == 0:
-            print("⚠️  No chat sessions found - chats were lost")
-        else:
-            print("✅ Database has some data")
-            
+        async with shared_prisma() as prisma:
+            # Fire all six queries together so they overlap on the wire
+            # instead of paying one round-trip each. Only fetch rows for the
+            # tables we actually print; the rest are COUNT(*) at the DB so no
+            # row data crosses the wire just to be len()'d and thrown away.
+            users, chats, servers = await asyncio.gather(
+                prisma.user.find_many(),
+                prisma.chatsession.find_many(),
+                prisma.mcpserver.find_many(),
+            )
+            message_count, api_key_count, oauth_token_count = await asyncio.gather(
+                prisma.message.count(),
+                prisma.apikey.count(),
+                prisma.oauthtoken.count(),
+            )
+
+            p(f"👥 Users: {len(users)}")
+            for user in users:
+                p(f"   - {user.email} (ID: {user.id})")
+
+            p(f"💬 Chat Sessions: {len(chats)}")
+            for chat in chats:
+                p(f"   - Chat {chat.id}: {chat.title} (Hash: {chat.hash})")
+
+            p(f"🔧 MCP Servers: {len(servers)}")
+            for server in servers:
+                p(f"   - {server.name}: {server.description}")
+
+            p(f"💭 Messages: {message_count}")
+            p(f"🔑 API Keys: {api_key_count}")
+            p(f"🔐 OAuth Tokens: {oauth_token_count}")
+
+            p("\n" + "=" * 40)
+
+            if len(users) == 0:
+                p("❌ DATABASE IS EMPTY - All data was lost!")
+                p("💡 You'll need to recreate your account and data")
+            elif len(chats) == 0:
+                p("⚠️  No chat sessions found - chats were lost")
+            else:
+                p("✅ Database has some data")
+
     except Exception as e:
-        print(f"❌ Error checking database: {e}")
+        p(f"❌ Error checking database: {e}")
     finally:
-        await prisma.disconnect()
+        flush()
 
 if __name__ == "__main__":
-    asyncio.run(check_database()) 
\ No newline at end of file
+    asyncio.run(check_database())
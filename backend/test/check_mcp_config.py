@@ -13,111 +13,115 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
 try:
-    from prisma import Prisma
+    from _db import shared_prisma
+    from _out import p, flush
     print("✅ Prisma import successful")
 except ImportError as e:
     print(f"❌ Prisma import failed: {e}")
     print("Make sure you have installed the requirements: pip install -r requirements.txt")
     sys.exit(1)
 
+async def iter_servers(prisma, chunk: int = 200):
+    """Yield MCP servers in chunks via cursor pagination
+
+    Keeps peak memory at O(chunk) instead of holding every row and its
+    config blob at once.
+    """
+    cursor = None
+    while True:
+        kwargs = {"take": chunk, "order": {"id": "asc"}}
+        if cursor is not None:
+            kwargs["cursor"] = {"id": cursor}
+            kwargs["skip"] = 1
+        batch = await prisma.mcpserver.find_many(**kwargs)
+        if not batch:
+            return
+        for server in batch:
+            yield server
+        cursor = batch[-1].id
+
 async def check_mcp_config():
     """Check MCP server configuration"""
-    print("🔍 Checking MCP Server Configuration")
-    print("=" * 45)
-    
+    p("🔍 Checking MCP Server Configuration")
+    p("=" * 45)
+
     try:
-        # Initialize Prisma
-        prisma = Prisma()
-        await prisma.connect()
-        print("✅ Database connection successful")
-        
-        # Get all MCP servers
-        servers = await prisma.mcpserver.find_many()
-        print(f"\n📊 Found {len(servers)} MCP server(s) in database")
-        
-        if not servers:
-            print("❌ No MCP servers found!")
-            print("   You need to add MCP servers through the settings page first.")
-            print("   Go to: http://localhost:3000/settings?tab=mcp-servers")
-            await prisma.disconnect()
-            return
-        
-        # Display each server's configuration
-        for i, server in enumerate(servers, 1):
-            print(f"\n{i}. Server: {server.name}")
-            print(f"   ID: {server.id}")
-            print(f"   User ID: {server.userId}")
-            print(f"   Description: {server.description or 'None'}")
-            print(f"   Created: {server.createdAt}")
-            
-            # Parse and display config
-            try:
-                if isinstance(server.config, str):
-                    config = json.loads(server.config)
-                    print(f"   Config (parsed from JSON):")
-                else:
-                    config = server.config
-                    print(f"   Config (direct):")
-                
-                print(f"     Type: {config.get('type', 'Unknown')}")
-                print(f"     URI: {config.get('uri', 'None')}")
-                print(f"     Transport: {config.get('transport', 'Unknown')}")
-                
+        async with shared_prisma() as prisma:
+            p("✅ Database connection successful")
+
+            # Count first; the rows themselves stream through in chunks
+            total = await prisma.mcpserver.count()
+            p(f"\n📊 Found {total} MCP server(s) in database")
+
+            if not total:
+                p("❌ No MCP servers found!")
+                p("   You need to add MCP servers through the settings page first.")
+                p("   Go to: http://localhost:3000/settings?tab=mcp-servers")
+                return
+
+            # Single streaming pass: display each server and collect its
+            # issues as it goes by, parsing the config exactly once
+            issues = []
+            i = 0
+            async for server in iter_servers(prisma):
+                i += 1
+                p(f"\n{i}. Server: {server.name}")
+                p(f"   ID: {server.id}")
+                p(f"   User ID: {server.userId}")
+                p(f"   Description: {server.description or 'None'}")
+                p(f"   Created: {server.createdAt}")
+
+                try:
+                    if isinstance(server.config, str):
+                        config = json.loads(server.config)
+                        p(f"   Config (parsed from JSON):")
+                    else:
+                        config = server.config
+                        p(f"   Config (direct):")
+                except Exception as e:
+                    p(f"   ❌ Config parsing error: {e}")
+                    p(f"   Raw config: {server.config}")
+                    issues.append(f"Server '{server.name}' has invalid config")
+                    continue
+
+                p(f"     Type: {config.get('type', 'Unknown')}")
+                p(f"     URI: {config.get('uri', 'None')}")
+                p(f"     Transport: {config.get('transport', 'Unknown')}")
+
                 # Validate config
                 if not config.get('uri'):
-                    print(f"     ❌ Missing URI!")
-                if not config.get('type'):
-                    print(f"     ❌ Missing type!")
-                    
-            except json.JSONDecodeError as e:
-                print(f"   ❌ Config parsing error: {e}")
-                print(f"   Raw config: {server.config}")
-            except Exception as e:
-                print(f"   ❌ Config error: {e}")
-        
-        await prisma.disconnect()
-        
-        # Summary
-        print(f"\n" + "=" * 45)
-        print("📊 Configuration Summary")
-        print("=" * 45)
-        
-        print(f"• Total MCP servers: {len(servers)}")
-        
-        # Check for common issues
-        issues = []
-        for server in servers:
-            try:
-                if isinstance(server.config, str):
-                    config = json.loads(server.config)
-                else:
-                    config = server.config
-                
-                if not config.get('uri'):
+                    p(f"     ❌ Missing URI!")
                     issues.append(f"Server '{server.name}' has no URI")
                 if not config.get('type'):
+                    p(f"     ❌ Missing type!")
                     issues.append(f"Server '{server.name}' has no type")
-                    
-            except:
-                issues.append(f"Server '{server.name}' has invalid config")
-        
+
+        # Summary
+        p(f"\n" + "=" * 45)
+        p("📊 Configuration Summary")
+        p("=" * 45)
+
+        p(f"• Total MCP servers: {total}")
+
         if issues:
-            print(f"\n❌ Issues found:")
+            p(f"\n❌ Issues found:")
             for issue in issues:
-                print(f"   • {issue}")
+                p(f"   • {issue}")
         else:
-            print(f"\n✅ All servers have valid configurations")
-        
-        print(f"\n💡 Next steps:")
-        print(f"   1. If you have MCP servers configured, try sending a message in chat")
-        print(f"   2. Check the server logs for connection attempts")
-        print(f"   3. Verify your MCP server URLs are correct and accessible")
-        print(f"   4. Ensure your MCP servers are running")
-        
+            p(f"\n✅ All servers have valid configurations")
+
+        p(f"\n💡 Next steps:")
+        p(f"   1. If you have MCP servers configured, try sending a message in chat")
+        p(f"   2. Check the server logs for connection attempts")
+        p(f"   3. Verify your MCP server URLs are correct and accessible")
+        p(f"   4. Ensure your MCP servers are running")
+
     except Exception as e:
-        print(f"❌ Error: {e}")
-        print("Make sure your database is running and properly configured.")
+        p(f"❌ Error: {e}")
+        p("Make sure your database is running and properly configured.")
+    finally:
+        flush()
 
 if __name__ == "__main__":
     import asyncio
-    asyncio.run(check_mcp_config()) 
\ No newline at end of file
+    asyncio.run(check_mcp_config())
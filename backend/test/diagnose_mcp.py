@@ -18,7 +18,8 @@ from typing import Dict, Any, List
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
 try:
-    from prisma import Prisma
+    from _db import shared_prisma
+    from _out import p, flush
     from app.services.mcp_service import MCPService
 except ImportError as e:
     print(f"❌ Import error: {e}")
@@ -27,198 +28,220 @@ except ImportError as e:
 
 async def diagnose_mcp_servers():
     """Diagnose MCP server configurations and connections"""
-    print("🔍 MCP Server Diagnostic Tool")
-    print("=" * 50)
-    
-    # Initialize Prisma
-    try:
-        prisma = Prisma()
-        await prisma.connect()
-        print("✅ Database connection successful")
-    except Exception as e:
-        print(f"❌ Database connection failed: {e}")
-        return
+    p("🔍 MCP Server Diagnostic Tool")
+    p("=" * 50)
     
     # Get all MCP servers from database
     try:
-        servers = await prisma.mcpserver.find_many()
-        print(f"\n📊 Found {len(servers)} MCP server(s) in database")
-        
-        if not servers:
-            print("❌ No MCP servers found in database")
-            print("   You need to add MCP servers through the settings page first")
-            await prisma.disconnect()
-            return
-        
-        # Display server configurations
-        print("\n🔧 MCP Server Configurations:")
-        print("-" * 35)
-        
-        for i, server in enumerate(servers, 1):
-            print(f"\n{i}. Server ID: {server.id}")
-            print(f"   Name: {server.name}")
-            print(f"   Description: {server.description or 'None'}")
-            print(f"   User ID: {server.userId}")
-            print(f"   Created: {server.createdAt}")
-            
-            # Parse and display config
-            try:
-                if isinstance(server.config, str):
-                    config = json.loads(server.config)
+        async with shared_prisma() as prisma:
+            p("✅ Database connection successful")
+            servers = await prisma.mcpserver.find_many()
+            p(f"\n📊 Found {len(servers)} MCP server(s) in database")
+
+            if not servers:
+                p("❌ No MCP servers found in database")
+                p("   You need to add MCP servers through the settings page first")
+                return
+
+            # Parse each config once; the display loop and the probes
+            # below all read from this instead of re-parsing the JSON
+            parsed = {}
+            for server in servers:
+                try:
+                    parsed[server.id] = (
+                        json.loads(server.config)
+                        if isinstance(server.config, str)
+                        else server.config
+                    )
+                except Exception as e:
+                    parsed[server.id] = e
+
+            # Display server configurations
+            p("\n🔧 MCP Server Configurations:")
+            p("-" * 35)
+
+            for i, server in enumerate(servers, 1):
+                p(f"\n{i}. Server ID: {server.id}")
+                p(f"   Name: {server.name}")
+                p(f"   Description: {server.description or 'None'}")
+                p(f"   User ID: {server.userId}")
+                p(f"   Created: {server.createdAt}")
+
+                config = parsed[server.id]
+                if isinstance(config, Exception):
+                    p(f"   ❌ Config parsing error: {config}")
+                    p(f"   Raw config: {server.config}")
                 else:
-                    config = server.config
-                
-                print(f"   Config:")
-                print(f"     Type: {config.get('type', 'Unknown')}")
-                print(f"     URI: {config.get('uri', 'None')}")
-                print(f"     Transport: {config.get('transport', 'Unknown')}")
-                
-            except Exception as e:
-                print(f"   ❌ Config parsing error: {e}")
-                print(f"   Raw config: {server.config}")
-        
-        await prisma.disconnect()
-        
+                    p(f"   Config:")
+                    p(f"     Type: {config.get('type', 'Unknown')}")
+                    p(f"     URI: {config.get('uri', 'None')}")
+                    p(f"     Transport: {config.get('transport', 'Unknown')}")
+
     except Exception as e:
-        print(f"❌ Error fetching MCP servers: {e}")
-        await prisma.disconnect()
+        p(f"❌ Error fetching MCP servers: {e}")
         return
-    
+    finally:
+        # Output interleaves with long awaits below, so flush at section
+        # boundaries rather than only at the end
+        flush()
+
     # Test MCP service connections
-    print("\n🔗 Testing MCP Service Connections:")
-    print("-" * 40)
+    p("\n🔗 Testing MCP Service Connections:")
+    p("-" * 40)
     
     mcp_service = MCPService()
-    
-    for i, server in enumerate(servers, 1):
-        print(f"\n{i}. Testing connection to '{server.name}':")
-        
-        # Parse config
-        try:
-            if isinstance(server.config, str):
-                config = json.loads(server.config)
-            else:
-                config = server.config
-            
-            # Add server name to config for better error messages
-            config['name'] = server.name
-            
-            print(f"   Config: {json.dumps(config, indent=2)}")
-            
-            # Test connection
-            server_id = f"test_server_{server.id}"
-            success = await mcp_service.connect_to_server(server_id, config)
-            
-            if success:
-                print(f"   ✅ Connection successful!")
-                
-                # Get tools from this server
-                client = mcp_service.clients.get(server_id)
-                if client:
-                    print(f"   📋 Available tools: {len(client.available_tools)}")
-                    for tool in client.available_tools:
-                        print(f"      • {tool.get('name', 'Unknown')}")
-                else:
-                    print(f"   ⚠️ No client found after successful connection")
-            else:
-                print(f"   ❌ Connection failed")
-                
-                # Get error details
-                client = mcp_service.clients.get(server_id)
-                if client and client.last_error:
-                    print(f"   Error: {client.last_error}")
-                
-        except Exception as e:
-            print(f"   ❌ Error testing connection: {e}")
-    
-    # Test tool availability
-    print("\n🔧 Testing Tool Availability:")
-    print("-" * 30)
-    
-    all_tools = mcp_service.get_all_tools()
-    connected_servers = mcp_service.get_connected_servers()
-    
-    print(f"Total connected servers: {len(connected_servers)}")
-    print(f"Total available tools: {len(all_tools)}")
-    
-    if all_tools:
-        print("\nAvailable tools:")
-        for tool in all_tools:
-            print(f"  • {tool.get('name')} (from {tool.get('server_name', 'Unknown')})")
-    else:
-        print("\n❌ No tools available")
-    
-    # Test specific tool calls
-    print("\n⚡ Testing Specific Tool Calls:")
-    print("-" * 35)
-    
-    test_tools = [
-        "mcp_Gmail_gmail-send-email",
-        "mcp_LinkedIn_linkedin-get-current-member-profile",
-        "mcp_ElevenLabs_text_to_speech"
-    ]
-    
-    for tool_name in test_tools:
-        print(f"\nTesting: {tool_name}")
-        
-        # Check if tool is available
-        is_available = mcp_service.is_tool_available(tool_name)
-        server_info = mcp_service.get_tool_server_info(tool_name)
-        
-        if is_available and server_info:
-            print(f"  ✅ Available from {server_info['server_name']}")
-            
-            # Try to call the tool
+    try:
+        async def _probe(server) -> List[str]:
+            """Test one server's connection, returning its report lines"""
+            lines = []
             try:
-                result = await mcp_service.call_tool(tool_name, {"instruction": "Test call"})
-                if "error" in result:
-                    print(f"  ❌ Tool call failed: {result['error']}")
+                config = parsed[server.id]
+                if isinstance(config, Exception):
+                    lines.append(f"   ❌ Config parsing error: {config}")
+                    return lines
+
+                # Add server name to config for better error messages
+                config['name'] = server.name
+
+                lines.append(f"   Config: {json.dumps(config, indent=2)}")
+
+                # Test connection
+                server_id = f"test_server_{server.id}"
+                success = await mcp_service.connect_to_server(server_id, config)
+
+                if success:
+                    lines.append(f"   ✅ Connection successful!")
+
+                    # Get tools from this server
+                    client = mcp_service.clients.get(server_id)
+                    if client:
+                        lines.append(f"   📋 Available tools: {len(client.available_tools)}")
+                        for tool in client.available_tools:
+                            lines.append(f"      • {tool.get('name', 'Unknown')}")
+                    else:
+                        lines.append(f"   ⚠️ No client found after successful connection")
                 else:
-                    print(f"  ✅ Tool call successful")
+                    lines.append(f"   ❌ Connection failed")
+
+                    # Get error details
+                    client = mcp_service.clients.get(server_id)
+                    if client and client.last_error:
+                        lines.append(f"   Error: {client.last_error}")
+
             except Exception as e:
-                print(f"  ❌ Tool call error: {e}")
-        else:
-            print(f"  ❌ Not available")
-            if server_info:
-                print(f"     Server info: {server_info}")
+                lines.append(f"   ❌ Error testing connection: {e}")
+            return lines
+
+        # Probe every server at once so one unreachable endpoint doesn't
+        # block the others for its full timeout; each probe buffers its own
+        # output so the report still prints in order
+        results = await asyncio.gather(*[_probe(s) for s in servers], return_exceptions=True)
+        for i, (server, result) in enumerate(zip(servers, results), 1):
+            p(f"\n{i}. Testing connection to '{server.name}':")
+            if isinstance(result, BaseException):
+                p(f"   ❌ Error testing connection: {result}")
+            else:
+                for line in result:
+                    p(line)
+        flush()
+
+        # Test tool availability
+        p("\n🔧 Testing Tool Availability:")
+        p("-" * 30)
     
-    # Summary and recommendations
-    print("\n" + "=" * 50)
-    print("📊 Diagnostic Summary")
-    print("=" * 50)
+        all_tools = mcp_service.get_all_tools()
+        connected_servers = mcp_service.get_connected_servers()
     
-    print(f"• MCP servers in database: {len(servers)}")
-    print(f"• Successfully connected: {len(connected_servers)}")
-    print(f"• Available tools: {len(all_tools)}")
+        p(f"Total connected servers: {len(connected_servers)}")
+        p(f"Total available tools: {len(all_tools)}")
     
-    if len(connected_servers) == 0:
-        print("\n❌ No MCP servers are currently connected!")
-        print("\n💡 Possible issues:")
-        print("   • MCP server URLs are incorrect")
-        print("   • MCP servers are not running")
-        print("   • Network connectivity issues")
-        print("   • Authentication problems")
-        print("   • Invalid server configurations")
+        if all_tools:
+            p("\nAvailable tools:")
+            for tool in all_tools:
+                p(f"  • {tool.get('name')} (from {tool.get('server_name', 'Unknown')})")
+        else:
+            p("\n❌ No tools available")
+        flush()
+
+        # Test specific tool calls
+        p("\n⚡ Testing Specific Tool Calls:")
+        p("-" * 35)
+    
+        test_tools = [
+            "mcp_Gmail_gmail-send-email",
+            "mcp_LinkedIn_linkedin-get-current-member-profile",
+            "mcp_ElevenLabs_text_to_speech"
+        ]
+
+        # Index tools by name once (the availability helpers scan all_tools
+        # linearly per lookup) and fire the calls together so their RTTs
+        # overlap instead of running back to back
+        tool_index = {t.get('name'): t for t in all_tools}
+        to_call = [t for t in test_tools if t in tool_index]
+        call_results = await asyncio.gather(
+            *[mcp_service.call_tool(t, {"instruction": "Test call"}) for t in to_call],
+            return_exceptions=True
+        )
+        results_by_tool = dict(zip(to_call, call_results))
+
+        for tool_name in test_tools:
+            p(f"\nTesting: {tool_name}")
+
+            tool = tool_index.get(tool_name)
+            if tool:
+                p(f"  ✅ Available from {tool.get('server_name', 'Unknown')}")
+
+                result = results_by_tool[tool_name]
+                if isinstance(result, BaseException):
+                    p(f"  ❌ Tool call error: {result}")
+                elif "error" in result:
+                    p(f"  ❌ Tool call failed: {result['error']}")
+                else:
+                    p(f"  ✅ Tool call successful")
+            else:
+                p(f"  ❌ Not available")
+    
+        # Summary and recommendations
+        p("\n" + "=" * 50)
+        p("📊 Diagnostic Summary")
+        p("=" * 50)
+    
+        p(f"• MCP servers in database: {len(servers)}")
+        p(f"• Successfully connected: {len(connected_servers)}")
+        p(f"• Available tools: {len(all_tools)}")
+    
+        if len(connected_servers) == 0:
+            p("\n❌ No MCP servers are currently connected!")
+            p("\n💡 Possible issues:")
+            p("   • MCP server URLs are incorrect")
+            p("   • MCP servers are not running")
+            p("   • Network connectivity issues")
+            p("   • Authentication problems")
+            p("   • Invalid server configurations")
         
-        print("\n🔧 Troubleshooting steps:")
-        print("   1. Verify MCP server URLs are correct")
-        print("   2. Ensure MCP servers are running and accessible")
-        print("   3. Check network connectivity")
-        print("   4. Review server configurations")
-        print("   5. Check server logs for errors")
+            p("\n🔧 Troubleshooting steps:")
+            p("   1. Verify MCP server URLs are correct")
+            p("   2. Ensure MCP servers are running and accessible")
+            p("   3. Check network connectivity")
+            p("   4. Review server configurations")
+            p("   5. Check server logs for errors")
+    
+        elif len(all_tools) == 0:
+            p("\n⚠️ Servers connected but no tools available!")
+            p("\n💡 Possible issues:")
+            p("   • MCP servers don't provide the expected tools")
+            p("   • Tool discovery failed")
+            p("   • Server configuration issues")
     
-    elif len(all_tools) == 0:
-        print("\n⚠️ Servers connected but no tools available!")
-        print("\n💡 Possible issues:")
-        print("   • MCP servers don't provide the expected tools")
-        print("   • Tool discovery failed")
-        print("   • Server configuration issues")
-    
-    else:
-        print("\n✅ MCP functionality is working!")
-        print(f"   You have {len(all_tools)} tools available from {len(connected_servers)} servers")
-    
-    print("\n✅ Diagnostic completed!")
+        else:
+            p("\n✅ MCP functionality is working!")
+            p(f"   You have {len(all_tools)} tools available from {len(connected_servers)} servers")
+    
+        p("\n✅ Diagnostic completed!")
+        flush()
+    finally:
+        # Always release the service's pooled HTTP session
+        await mcp_service.close()
 
 if __name__ == "__main__":
     asyncio.run(diagnose_mcp_servers()) 
\ No newline at end of file
@@ -3,11 +3,41 @@
 Script to fix Prisma client and test database connection
 """
 
+import asyncio
 import os
 import sys
 import subprocess
 from pathlib import Path
 
+async def test_db():
+    """Test the database connection with a couple of basic queries"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+
+        from prisma import Prisma
+
+        prisma = Prisma()
+        await prisma.connect()
+        print("✅ Database connection successful")
+
+        # Test basic operations
+        users = await prisma.user.find_many()
+        print(f"✅ Found {len(users)} users")
+
+        servers = await prisma.mcpserver.find_many()
+        print(f"✅ Found {len(servers)} MCP servers")
+
+        await prisma.disconnect()
+        print("✅ Database test completed successfully")
+        return True
+
+    except Exception as e:
+        print(f"❌ Database test failed: {e}")
+        import traceback
+        print(f"   Traceback: {traceback.format_exc()}")
+        return False
+
 def run_command(command, description):
     """Run a command and handle errors"""
     print(f"\n🔧 {description}")
@@ -72,63 +102,17 @@ def main():
         print("   ❌ Invalid choice")
         return
     
-    # Step 3: Test database connection
+    # Step 3: Test database connection — run inline; we're already in a
+    # Python process, so spawning a temp script just re-pays interpreter
+    # startup and the Prisma import
     print(f"\n🧪 Testing Database Connection")
-    
-    test_script = """
-import asyncio
-import sys
-from pathlib import Path
-
-# Add the backend directory to Python path
-backend_dir = Path(__file__).parent
-sys.path.insert(0, str(backend_dir))
 
-from dotenv import load_dotenv
-load_dotenv()
+    if asyncio.run(test_db()):
+        print("✅ Database test passed")
+    else:
+        print("❌ Database test failed")
 
-async def test_db():
-    try:
-        from prisma import Prisma
-        
-        prisma = Prisma()
-        await prisma.connect()
-        print("✅ Database connection successful")
-        
-        # Test basic operations
-        users = await prisma.user.find_many()
-        print(f"✅ Found {len(users)} users")
-        
-        servers = await prisma.mcpserver.find_many()
-        print(f"✅ Found {len(servers)} MCP servers")
-        
-        await prisma.disconnect()
-        print("✅ Database test completed successfully")
-        
-    except Exception as e:
-        print(f"❌ Database test failed: {e}")
-        import traceback
-        print(f"   Traceback: {traceback.format_exc()}")
 
-if __name__ == "__main__":
-    asyncio.run(test_db())
-"""
-    
-    # Write test script
-    test_file = backend_dir / "temp_db_test.py"
-    with open(test_file, "w") as f:
-        f.write(test_script)
-    
-    # Run test
-    if not run_command("python temp_db_test.py", "Testing database connection"):
-        print("❌ Database test failed")
-    else:
-        print("✅ Database test passed")
-    
-    # Clean up
-    if test_file.exists():
-        test_file.unlink()
-    
     print(f"\n🎉 Prisma fix completed!")
     print(f"\n💡 Next steps:")
     print(f"1. Try adding an MCP server again")
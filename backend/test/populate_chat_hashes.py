@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Script to backfill the hash column on existing chat sessions
+
+Older rows predate the hash field, so chat URLs for them 404. This
+derives a hash for every session that is missing one and writes them all
+back in a single UPDATE instead of one round-trip per row.
+"""
+
+import asyncio
+from secrets import token_hex
+
+from _db import shared_prisma
+from _out import p, flush
+
+async def populate_chat_hashes():
+    """Backfill hashes for chat sessions that don't have one"""
+    p("🔄 Populating Chat Hashes...")
+    p("=" * 40)
+
+    try:
+        async with shared_prisma() as prisma:
+            chats = await prisma.chatsession.find_many(where={"hash": None})
+            p(f"💬 Chat sessions missing a hash: {len(chats)}")
+
+            if not chats:
+                p("✅ All chat sessions already have hashes")
+                return
+
+            # The hash only needs to be unique; token_hex is cheaper than
+            # deriving anything from the row and is safe to expose in URLs
+            pairs = [(chat.id, token_hex(16)) for chat in chats]
+
+            # One UPDATE with a CASE per row instead of N sequential
+            # update() calls (each of which is its own round-trip).
+            # Parameters interleave as ($1 id, $2 hash) per row, with the
+            # id list reused for the WHERE clause.
+            params: list = []
+            cases = []
+            for chat_id, chat_hash in pairs:
+                cases.append(f"WHEN ${len(params) + 1} THEN ${len(params) + 2}")
+                params.extend([chat_id, chat_hash])
+
+            id_placeholders = []
+            for chat_id, _ in pairs:
+                id_placeholders.append(f"${len(params) + 1}")
+                params.append(chat_id)
+
+            query = (
+                'UPDATE "ChatSession" '
+                f'SET hash = CASE id {" ".join(cases)} END '
+                f'WHERE id IN ({", ".join(id_placeholders)})'
+            )
+            updated = await prisma.execute_raw(query, *params)
+            p(f"✅ Updated {updated} chat session(s)")
+
+            # Verify with a server-side COUNT(*) rather than fetching the
+            # remaining rows just to len() them
+            remaining = await prisma.chatsession.count(where={"hash": None})
+            if remaining == 0:
+                p("✅ All chat sessions now have hashes")
+            else:
+                p(f"⚠️  {remaining} chat session(s) still missing a hash")
+
+    except Exception as e:
+        p(f"❌ Error populating chat hashes: {e}")
+    finally:
+        flush()
+
+if __name__ == "__main__":
+    asyncio.run(populate_chat_hashes())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Quick smoke test against a locally running backend
+
+Hits the public endpoints and, when AUTH_TOKEN is set in the
+environment, the authenticated ones too. All requests go through one
+httpx.AsyncClient (HTTP/2 when the h2 package is installed) so every
+call reuses the same keep-alive connection, and independent calls run
+concurrently.
+"""
+
+import asyncio
+import os
+import sys
+
+import httpx
+
+BASE_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000")
+
+def _make_client() -> httpx.AsyncClient:
+    """Build the shared client, falling back to HTTP/1.1 without h2"""
+    kwargs = dict(
+        base_url=BASE_URL,
+        timeout=10,
+        limits=httpx.Limits(max_keepalive_connections=4),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        return httpx.AsyncClient(http2=True, **kwargs)
+    except ImportError:
+        return httpx.AsyncClient(**kwargs)
+
+async def _check(client: httpx.AsyncClient, path: str) -> bool:
+    """GET one endpoint and report the outcome"""
+    try:
+        response = await client.get(path)
+    except httpx.HTTPError as e:
+        print(f"❌ GET {path} failed: {e}")
+        return False
+    if response.status_code == 200:
+        print(f"✅ GET {path} -> {response.status_code}")
+        return True
+    print(f"❌ GET {path} -> {response.status_code}")
+    return False
+
+async def quick_test() -> bool:
+    """Run the smoke test, returning True when every call succeeded"""
+    print("🧪 Quick Backend Test")
+    print("=" * 40)
+    print(f"Target: {BASE_URL}")
+
+    async with _make_client() as client:
+        # Public endpoints, fired together so total latency is the
+        # slower of the two rather than their sum
+        results = await asyncio.gather(_check(client, "/health"), _check(client, "/"))
+        ok = all(results)
+
+        # Authenticated endpoints (login is OTP-based, so the token has
+        # to come from the environment)
+        token = os.getenv("AUTH_TOKEN")
+        if not token:
+            print("⏭️  AUTH_TOKEN not set - skipping authenticated endpoints")
+        else:
+            # Set once on the client instead of per call
+            client.headers["Authorization"] = f"Bearer {token}"
+            results = await asyncio.gather(
+                _check(client, "/auth/me"),
+                _check(client, "/chat/chats"),
+            )
+            ok = ok and all(results)
+
+    print("=" * 40)
+    print("✅ All checks passed" if ok else "❌ Some checks failed")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(quick_test()) else 1)
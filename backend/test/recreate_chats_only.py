@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Script to recreate the sample chat sessions for an existing user
+
+Drops the user's current chats and reseeds the three sample
+conversations via the shared seeding module.
+"""
+
+import asyncio
+import sys
+
+from _db import shared_prisma
+from _out import p, flush
+from _seed_common import seed_chats
+
+async def recreate_chats(user_email: str):
+    """Delete and reseed the sample chats for the given user"""
+    p("🔄 Recreating Sample Chats...")
+    p("=" * 40)
+
+    try:
+        async with shared_prisma() as prisma:
+            user = await prisma.user.find_unique(where={"email": user_email})
+            if not user:
+                p(f"❌ User {user_email} not found")
+                return
+
+            await seed_chats(prisma, user.id)
+
+    except Exception as e:
+        p(f"❌ Error recreating chats: {e}")
+    finally:
+        flush()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python recreate_chats_only.py <user_email>")
+        sys.exit(1)
+    asyncio.run(recreate_chats(sys.argv[1]))
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Script to recreate the full test data set
+
+Ensures the test user exists, then drops and reseeds their sample chat
+sessions via the shared seeding module.
+"""
+
+import asyncio
+import sys
+
+from _db import shared_prisma
+from _out import p, flush
+from _seed_common import seed_chats
+
+DEFAULT_EMAIL = "test@example.com"
+
+async def recreate_test_data(user_email: str):
+    """Upsert the test user and reseed their sample chats"""
+    p("🔄 Recreating Test Data...")
+    p("=" * 40)
+
+    try:
+        async with shared_prisma() as prisma:
+            user = await prisma.user.upsert(
+                where={"email": user_email},
+                data={
+                    "create": {"email": user_email, "name": "Test User"},
+                    "update": {},
+                },
+            )
+            p(f"👤 User ready: {user.email} (ID: {user.id})")
+
+            await seed_chats(prisma, user.id)
+
+    except Exception as e:
+        p(f"❌ Error recreating test data: {e}")
+    finally:
+        flush()
+
+if __name__ == "__main__":
+    email = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_EMAIL
+    asyncio.run(recreate_test_data(email))
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Diagnostic runner: execute the test scripts over one database connection
+
+Running the scripts individually pays a fresh Prisma engine start and
+connect per script. This driver holds the shared client open for the
+whole run, so every script reuses the same connection pool.
+"""
+
+import asyncio
+
+from _db import shared_prisma
+from check_database_status import check_database
+from check_mcp_config import check_mcp_config
+from populate_chat_hashes import populate_chat_hashes
+
+async def run_all():
+    """Run all diagnostic scripts over a single shared connection"""
+    # Holding the context open pins shared_prisma's refcount above zero,
+    # so the nested uses inside each script reuse this connection
+    # instead of reconnecting per script
+    async with shared_prisma():
+        await check_database()
+        await check_mcp_config()
+        await populate_chat_hashes()
+
+if __name__ == "__main__":
+    asyncio.run(run_all())
@@ -14,10 +14,29 @@ Usage:
 import asyncio
 import subprocess
 import sys
-import time
 import os
 from pathlib import Path
 
+import aiohttp
+
+async def wait_for_http(method: str, url: str, json_payload=None,
+                        attempts: int = 50, delay: float = 0.1) -> bool:
+    """Poll an endpoint until it answers, returning True once it's live
+
+    Replaces fixed sleeps after process start: returns as soon as the
+    port responds instead of always waiting the worst case.
+    """
+    async with aiohttp.ClientSession() as session:
+        for _ in range(attempts):
+            try:
+                async with session.request(method, url, json=json_payload) as response:
+                    if response.status < 500:
+                        return True
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(delay)
+    return False
+
 def print_banner():
     """Print startup banner"""
     print("""
@@ -89,70 +108,68 @@ async def check_database():
         print("   3. Prisma migrations are applied")
         return False
 
-def start_simple_mcp_servers():
+async def start_simple_mcp_servers():
     """Start the simple MCP servers"""
     print("\n🚀 Starting simple MCP servers...")
-    
+
     try:
         # Start the servers in the background
-        process = subprocess.Popen([
-            sys.executable, "-m", "app.services.simple_mcp_servers"
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        # Wait a moment for startup
-        time.sleep(3)
-        
-        # Check if process is still running
-        if process.poll() is None:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "app.services.simple_mcp_servers",
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+
+        # Actively poll until the port is live instead of sleeping a
+        # fixed three seconds
+        ready = await wait_for_http(
+            "POST", "http://localhost:8001/mcp",
+            json_payload={"jsonrpc": "2.0", "id": 1, "method": "tools/list"}
+        )
+
+        if ready and process.returncode is None:
             print("✅ Simple MCP servers started successfully")
             print("   URL: http://localhost:8001")
             print("   Process ID:", process.pid)
             return process
-        else:
-            stdout, stderr = process.communicate()
-            print(f"❌ Failed to start MCP servers:")
-            print(f"   STDOUT: {stdout.decode()}")
-            print(f"   STDERR: {stderr.decode()}")
-            return None
-            
+
+        if process.returncode is None:
+            process.terminate()
+        stdout, stderr = await process.communicate()
+        print(f"❌ Failed to start MCP servers:")
+        print(f"   STDOUT: {stdout.decode()}")
+        print(f"   STDERR: {stderr.decode()}")
+        return None
+
     except Exception as e:
         print(f"❌ Error starting MCP servers: {e}")
         return None
 
-def test_mcp_servers():
+async def test_mcp_servers():
     """Test if MCP servers are responding"""
     print("\n🧪 Testing MCP servers...")
-    
+
     try:
-        import aiohttp
-        import asyncio
-        
-        async def test_endpoint():
-            async with aiohttp.ClientSession() as session:
-                # Test the combined endpoint
-                async with session.post(
-                    "http://localhost:8001/mcp",
-                    json={
-                        "jsonrpc": "2.0",
-                        "id": 1,
-                        "method": "tools/list"
-                    },
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        tools = data.get("result", {}).get("tools", [])
-                        print(f"✅ MCP servers responding correctly")
-                        print(f"   Found {len(tools)} tools")
-                        return True
-                    else:
-                        print(f"❌ MCP servers returned status {response.status}")
-                        return False
-        
-        # Run the test
-        result = asyncio.run(test_endpoint())
-        return result
-        
+        async with aiohttp.ClientSession() as session:
+            # Test the combined endpoint
+            async with session.post(
+                "http://localhost:8001/mcp",
+                json={
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "tools/list"
+                },
+                headers={"Content-Type": "application/json"}
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    tools = data.get("result", {}).get("tools", [])
+                    print(f"✅ MCP servers responding correctly")
+                    print(f"   Found {len(tools)} tools")
+                    return True
+                else:
+                    print(f"❌ MCP servers returned status {response.status}")
+                    return False
+
     except Exception as e:
         print(f"❌ Error testing MCP servers: {e}")
         return False
@@ -180,38 +197,41 @@ def add_test_servers_to_db():
         print(f"❌ Error adding test servers: {e}")
         return False
 
-def start_chatconnect_backend():
+async def start_chatconnect_backend():
     """Start ChatConnect backend (optional)"""
     print("\n🤖 Starting ChatConnect backend...")
-    
+
     try:
         # Check if main.py exists
         if not Path("app/main.py").exists():
             print("❌ app/main.py not found")
             print("   Make sure you're in the backend directory")
             return None
-        
+
         # Start the backend
-        process = subprocess.Popen([
-            sys.executable, "-m", "uvicorn", "app.main:app", 
-            "--host", "0.0.0.0", "--port", "8000", "--reload"
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        # Wait for startup
-        time.sleep(5)
-        
-        if process.poll() is None:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "0.0.0.0", "--port", "8000", "--reload",
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+
+        # Poll /health until it answers instead of a fixed five seconds
+        ready = await wait_for_http("GET", "http://localhost:8000/health", attempts=100)
+
+        if ready and process.returncode is None:
             print("✅ ChatConnect backend started successfully")
             print("   URL: http://localhost:8000")
             print("   Process ID:", process.pid)
             return process
-        else:
-            stdout, stderr = process.communicate()
-            print(f"❌ Failed to start backend:")
-            print(f"   STDOUT: {stdout.decode()}")
-            print(f"   STDERR: {stderr.decode()}")
-            return None
-            
+
+        if process.returncode is None:
+            process.terminate()
+        stdout, stderr = await process.communicate()
+        print(f"❌ Failed to start backend:")
+        print(f"   STDOUT: {stdout.decode()}")
+        print(f"   STDERR: {stderr.decode()}")
+        return None
+
     except Exception as e:
         print(f"❌ Error starting backend: {e}")
         return None
@@ -266,12 +286,12 @@ async def main():
         return
     
     # Start MCP servers
-    mcp_process = start_simple_mcp_servers()
+    mcp_process = await start_simple_mcp_servers()
     if not mcp_process:
         return
     
     # Test MCP servers
-    if not test_mcp_servers():
+    if not await test_mcp_servers():
         print("❌ MCP servers are not responding correctly")
         return
     
@@ -280,7 +300,7 @@ async def main():
     try:
         response = input().lower().strip()
         if response in ['y', 'yes']:
-            backend_process = start_chatconnect_backend()
+            backend_process = await start_chatconnect_backend()
             if backend_process:
                 print("\n✅ Both MCP servers and ChatConnect backend are running!")
             else:
@@ -297,7 +317,7 @@ async def main():
     try:
         print("\n🔄 Press Ctrl+C to stop all servers...")
         while True:
-            time.sleep(1)
+            await asyncio.sleep(1)
     except KeyboardInterrupt:
         print("\n\n🛑 Shutting down...")
         